@@ -0,0 +1,302 @@
+import os
+import time
+import numpy as np
+import cv2
+import funciones_Parcial1 as fun1
+import funciones_Parcial2 as fun
+
+try:
+    import kernels_numba
+except ImportError:
+    kernels_numba = None
+
+# Registro de implementaciones por operación.
+#
+# Cada operación tiene una versión de referencia (los ciclos originales) y
+# puede tener versiones 'numpy' (vectorizada), 'opencv' y 'numba' (JIT).
+# El backend se elige, en este orden de prioridad:
+#   1. el argumento backend= de ejecutar()
+#   2. configurar(...) (por operación o global)
+#   3. las variables de entorno PDI_BACKEND_<OPERACION> y PDI_BACKEND
+#   4. automático: de los que pasan la prueba de paridad, el de menor tiempo
+#      medido sobre una imagen de FORMA_MEDICION (la medición se hace una vez)
+
+BACKENDS = ('numba', 'opencv', 'numpy', 'referencia')
+FORMA_MEDICION = (256, 256)
+
+_REGISTRO = {}
+_CONFIG = {'global': None, 'operaciones': {}}
+_PARIDAD = {} # Caché de (operacion, backend) -> bool
+_TIEMPOS = {} # Caché de (operacion, backend) -> segundos
+
+def registrar(operacion, backend, funcion, prueba=None, margen=0, tolerancia=0):
+    """
+    Registra una implementación de una operación.
+
+    Parámetros:
+    operacion (str): Nombre de la operación (p. ej. 'clahe').
+    backend (str): Uno de BACKENDS.
+    funcion (callable): Implementación.
+    prueba (callable o lista): Para la referencia: recibe un np.random.Generator
+        y la forma de la imagen, y devuelve la tupla de argumentos con la que se
+        comparan los backends. Con una lista se comparan todos los casos y el
+        tiempo se mide con el primero.
+    margen (int): Píxeles de borde que no se comparan (bordes tratados distinto).
+    tolerancia (float): Diferencia absoluta máxima permitida frente a la referencia.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: '{backend}'. Opciones: {BACKENDS}")
+
+    op = _REGISTRO.setdefault(operacion, {'impl': {}, 'prueba': None, 'margen': 0, 'tolerancia': 0})
+    op['impl'][backend] = funcion
+    if backend == 'referencia':
+        pruebas = list(prueba) if isinstance(prueba, (list, tuple)) else [prueba]
+        op.update(prueba=pruebas, margen=margen, tolerancia=tolerancia)
+
+def operaciones():
+    return sorted(_REGISTRO)
+
+def disponibles(operacion):
+    _validar_operacion(operacion)
+    return [b for b in BACKENDS if b in _REGISTRO[operacion]['impl']]
+
+def configurar(backend=None, **por_operacion):
+    """
+    Fija el backend preferido de forma global y/o por operación.
+
+    Ejemplo: configurar('opencv', clahe='numba')
+    """
+    for b in (backend, *por_operacion.values()):
+        if b is not None and b != 'auto' and b not in BACKENDS:
+            raise ValueError(f"Backend desconocido: '{b}'. Opciones: {BACKENDS}")
+
+    _CONFIG['global'] = None if backend == 'auto' else backend
+    for operacion, b in por_operacion.items():
+        _validar_operacion(operacion)
+        _CONFIG['operaciones'][operacion] = None if b == 'auto' else b
+
+def _validar_operacion(operacion):
+    if operacion not in _REGISTRO:
+        raise ValueError(f"Operación desconocida: '{operacion}'. Opciones: {operaciones()}")
+
+def _preferido(operacion):
+    # Preferencia por configuración o entorno (None = automático)
+    for b in (_CONFIG['operaciones'].get(operacion),
+              _CONFIG['global'],
+              os.environ.get('PDI_BACKEND_' + operacion.upper()),
+              os.environ.get('PDI_BACKEND')):
+        if b and b != 'auto':
+            return b
+    return None
+
+def seleccionar(operacion, backend=None):
+    """
+    Devuelve (nombre_backend, funcion) para la operación.
+
+    Un backend pedido explícitamente que no exista para la operación es un error;
+    una preferencia global o de entorno que no aplique cae al modo automático.
+    """
+    _validar_operacion(operacion)
+    impl = _REGISTRO[operacion]['impl']
+
+    if backend is not None and backend != 'auto':
+        if backend not in impl:
+            raise ValueError(f"La operación '{operacion}' no tiene backend '{backend}'. "
+                             f"Disponibles: {disponibles(operacion)}")
+        return backend, impl[backend]
+
+    preferido = _preferido(operacion)
+    if preferido in impl:
+        return preferido, impl[preferido]
+
+    # Automático: el más rápido de los que coinciden con la referencia
+    candidatos = [b for b in disponibles(operacion) if b != 'referencia' and verificar(operacion, b)]
+    if not candidatos:
+        return 'referencia', impl['referencia']
+    if len(candidatos) > 1:
+        candidatos.sort(key=lambda b: medir(operacion, b))
+    return candidatos[0], impl[candidatos[0]]
+
+def ejecutar(operacion, *args, backend=None, **kwargs):
+    _, funcion = seleccionar(operacion, backend)
+    return funcion(*args, **kwargs)
+
+#--------------------------------------------#
+#----------- PRUEBAS DE PARIDAD -------------#
+#--------------------------------------------#
+
+def diferencia(operacion, backend, semilla=0):
+    """Diferencia absoluta máxima entre un backend y la referencia (en todos los casos)."""
+    op = _REGISTRO[operacion]
+    maxima = 0.0
+    for prueba in op['prueba']:
+        args = prueba(np.random.default_rng(semilla))
+
+        ref = np.asarray(op['impl']['referencia'](*args), dtype=np.float64)
+        out = np.asarray(op['impl'][backend](*args), dtype=np.float64)
+        if ref.shape != out.shape:
+            return np.inf
+
+        m = op['margen']
+        if m > 0:
+            ref = ref[m:-m, m:-m]
+            out = out[m:-m, m:-m]
+        maxima = max(maxima, float(np.max(np.abs(ref - out))))
+    return maxima
+
+def verificar(operacion, backend):
+    """True si el backend coincide con la referencia (el resultado se guarda en caché)."""
+    clave = (operacion, backend)
+    if clave not in _PARIDAD:
+        try:
+            _PARIDAD[clave] = diferencia(operacion, backend) <= _REGISTRO[operacion]['tolerancia']
+        except Exception:
+            _PARIDAD[clave] = False
+    return _PARIDAD[clave]
+
+def medir(operacion, backend, repeticiones=3):
+    """Mejor tiempo en segundos del backend sobre una imagen de FORMA_MEDICION (en caché)."""
+    clave = (operacion, backend)
+    if clave not in _TIEMPOS:
+        op = _REGISTRO[operacion]
+        args = op['prueba'][0](np.random.default_rng(0), FORMA_MEDICION)
+        funcion = op['impl'][backend]
+        funcion(*args) # Calentamiento (compilación JIT)
+
+        mejor = np.inf
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion(*args)
+            mejor = min(mejor, time.perf_counter() - inicio)
+        _TIEMPOS[clave] = mejor
+    return _TIEMPOS[clave]
+
+def verificar_todo():
+    """Compara todos los backends de todas las operaciones contra la referencia."""
+    resultados = {}
+    for operacion in operaciones():
+        for b in disponibles(operacion):
+            if b != 'referencia':
+                resultados[(operacion, b)] = (diferencia(operacion, b), verificar(operacion, b))
+    return resultados
+
+#--------------------------------------------#
+#------- IMPLEMENTACIONES OPENCV ------------#
+#--------------------------------------------#
+
+def _ecualizacion_cv(image):
+    nk = cv2.calcHist([image], [0], None, [256], [0, 256]).ravel()
+    T = np.round(255 * np.cumsum(nk / image.size)).astype(np.uint8)
+    return cv2.LUT(image, T)
+
+def _filtro_adaptativo_cv(J):
+    var_total = np.var(J)
+    if var_total == 0: return J
+    media_local = cv2.blur(J, (3, 3))
+    var_local = cv2.blur(J**2, (3, 3)) - media_local**2
+    return fun._filtro_adaptativo(J, var_total, media_local, var_local)
+
+def _estadisticas_mediana_cv(img_pad, pad_max, forma, S):
+    # Recortamos la región que necesita la ventana S: los bordes de OpenCV
+    # nunca se usan porque el padding reflejado ya está incluido
+    filas, columnas = forma
+    r = S // 2
+    a = pad_max - r
+    region = np.ascontiguousarray(img_pad[a:a + filas + 2 * r, a:a + columnas + 2 * r])
+    kernel = np.ones((S, S), dtype=np.uint8)
+
+    z_min = cv2.erode(region, kernel)[r:r + filas, r:r + columnas]
+    z_med = cv2.medianBlur(region, S)[r:r + filas, r:r + columnas]
+    z_max = cv2.dilate(region, kernel)[r:r + filas, r:r + columnas]
+    return z_min.astype(np.float32), z_med.astype(np.float32), z_max.astype(np.float32)
+
+def _filtro_mediana_cv(img, S_max):
+    # medianBlur solo acepta ventanas grandes en uint8
+    if img.dtype != np.uint8:
+        return fun.filtro_medianaOpt(img, S_max)
+    if S_max % 2 == 0:
+        raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+
+    pad_max = S_max // 2
+    img_pad = cv2.copyMakeBorder(img, pad_max, pad_max, pad_max, pad_max, cv2.BORDER_REFLECT_101)
+
+    niveles = (_estadisticas_mediana_cv(img_pad, pad_max, img.shape, S)
+               for S in range(3, S_max + 1, 2))
+    return fun.mediana_adaptativa(img.astype(np.float32), niveles)
+
+#--------------------------------------------#
+#-------- IMÁGENES DE PRUEBA ----------------#
+#--------------------------------------------#
+
+def _imagen_prueba(rng, forma=(48, 64), ruido=0.08):
+    img = rng.integers(0, 256, forma).astype(np.uint8)
+    # Bloques planos para que existan ventanas con varianza baja
+    img[8:24, 8:40] = 120
+    # Ruido de sal y pimienta para ejercitar la lógica de impulsos
+    img[rng.random(forma) < ruido] = 0
+    img[rng.random(forma) < ruido] = 255
+    return img
+
+def _prueba_imagen(rng, forma=(48, 64)):
+    return (_imagen_prueba(rng, forma),)
+
+def _prueba_ruido(rng, forma=(48, 64)):
+    return (_imagen_prueba(rng, forma).astype(np.float64),)
+
+def _prueba_mediana(rng, forma=(48, 64)):
+    return (_imagen_prueba(rng, forma), 7)
+
+def _prueba_mediana_grande(rng, forma=(48, 64)):
+    # Con ruido denso muchos píxeles llegan a ventanas desde S_HISTOGRAMA,
+    # así se ejercita también el motor de histogramas
+    return (_imagen_prueba(rng, forma, ruido=0.45), fun.S_HISTOGRAMA + 2)
+
+def _prueba_color(rng, forma=(48, 64)):
+    return (rng.integers(0, 256, (*forma, 3)).astype(np.uint8),)
+
+#--------------------------------------------#
+#---------------- REGISTRO ------------------#
+#--------------------------------------------#
+
+registrar('clahe', 'referencia', fun.clahe, _prueba_imagen, tolerancia=1)
+registrar('clahe', 'numpy', fun.claheOpt)
+
+registrar('ecualizacion_histograma', 'referencia', fun.ecualizacion_histograma, _prueba_imagen)
+registrar('ecualizacion_histograma', 'numpy', fun.ecualizacion_histogramaOpt)
+registrar('ecualizacion_histograma', 'opencv', _ecualizacion_cv)
+
+# La referencia rellena con ceros y las versiones vectorizadas reflejan el borde
+registrar('filtro_adaptativo', 'referencia', fun.filtro_adaptativo_local, _prueba_ruido,
+          margen=1, tolerancia=1e-6)
+registrar('filtro_adaptativo', 'numpy', fun.filtro_adaptativo_localOpt)
+registrar('filtro_adaptativo', 'opencv', _filtro_adaptativo_cv)
+
+registrar('filtro_mediana', 'referencia', fun.filtro_mediana,
+          [_prueba_mediana, _prueba_mediana_grande])
+registrar('filtro_mediana', 'numpy', fun.filtro_medianaOpt)
+registrar('filtro_mediana', 'opencv', _filtro_mediana_cv)
+
+# cv2.cvtColor redondea y la versión manual trunca
+registrar('escala_gris', 'referencia', fun1.manual_rgb_a_gris, _prueba_color, tolerancia=1)
+registrar('escala_gris', 'opencv', fun1.escalaGris)
+
+if kernels_numba is not None:
+    registrar('clahe', 'numba', kernels_numba.clahe)
+    registrar('ecualizacion_histograma', 'numba', kernels_numba.ecualizacion_histograma)
+    registrar('filtro_adaptativo', 'numba', kernels_numba.filtro_adaptativo_local)
+    registrar('filtro_mediana', 'numba', kernels_numba.filtro_mediana)
+
+if __name__ == '__main__':
+    # Pruebas de paridad de todos los backends contra la referencia
+    fallos = 0
+    for (operacion, b), (dif, ok) in verificar_todo().items():
+        tiempo = f"{medir(operacion, b) * 1000:8.2f} ms" if ok else ''
+        print(f"{operacion:<25} {b:<10} dif. máx = {dif:<12.3g} {'OK' if ok else 'FALLA':<6} {tiempo}")
+        fallos += not ok
+
+    print()
+    for operacion in operaciones():
+        print(f"{operacion:<25} -> {seleccionar(operacion)[0]}")
+
+    if fallos:
+        raise SystemExit(f"{fallos} backend(s) no coinciden con la referencia")
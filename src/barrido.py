@@ -0,0 +1,149 @@
+import os
+import glob
+import argparse
+import itertools
+import numpy as np
+import cv2
+import funciones_Parcial2 as fun
+
+# Barrido de parámetros que reutiliza los cálculos intermedios costosos.
+#
+# Por cada imagen se calcula una sola vez lo que no depende del parámetro barrido:
+#   highboost             f_bar por cada ksize, reutilizado para todos los k
+#   gradiente_laplaciano  g_norm, reutilizado para todos los gamma
+#   filtro_mediana        niveles (z_min, z_med, z_max) hasta el S_max mayor,
+#                         reutilizados para todos los S_max
+#   clahe                 histogramas de los cuadrantes y pesos de interpolación,
+#                         reutilizados para todos los cliplimit
+
+REJILLA_EJEMPLO = {
+    'highboost': {'k': [1.0, 1.5, 1.8, 2.5], 'ksize': [3, 5, 7]},
+    'gradiente_laplaciano': {'gamma': [0.4, 0.6, 0.8, 1.0, 1.5]},
+    'filtro_mediana': {'S_max': [3, 5, 7, 9, 11]},
+    'clahe': {'cliplimit': [20, 40, 80, 160]},
+}
+
+def etiqueta(params):
+    """Nombre de carpeta para una combinación, p. ej. 'k=1.5_ksize=5'."""
+    return '_'.join(f"{k}={v}" for k, v in sorted(params.items()))
+
+def _combinaciones(valores):
+    nombres = sorted(valores)
+    for combo in itertools.product(*(valores[n] for n in nombres)):
+        yield dict(zip(nombres, combo))
+
+def _barrido_highboost(img, valores):
+    f = img.astype(np.float32)
+    for ksize in valores.get('ksize', [5]):
+        f_bar = fun.suavizado_caja(f, ksize)
+        for k in valores.get('k', [1.5]):
+            yield {'k': k, 'ksize': ksize}, fun.highboost_desde(f, f_bar, k)
+
+def _barrido_gradiente(img, valores):
+    _, _, _, g_norm = fun.gradiente_laplaciano_base(img)
+    for gamma in valores.get('gamma', [0.8]):
+        yield {'gamma': gamma}, (g_norm ** gamma * 255).astype(np.uint8)
+
+def _barrido_mediana(img, valores):
+    tamanos = sorted(valores.get('S_max', [7]))
+    for S_max in tamanos:
+        if S_max % 2 == 0:
+            raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+    niveles = list(fun.niveles_mediana(img, tamanos[-1]))
+    z_xy = img.astype(np.float32)
+    for S_max in tamanos:
+        # Nivel i corresponde a S = 3 + 2i
+        yield {'S_max': S_max}, fun.mediana_adaptativa(z_xy, niveles[:(S_max - 1) // 2])
+
+def _barrido_clahe(img, valores):
+    freqs, area = fun._histogramas_clahe(img)
+    pesos = fun._pesos_clahe(*img.shape)
+    for cliplimit in valores.get('cliplimit', [80]):
+        tablas = fun._tablas_clahe_desde(freqs, area, cliplimit)
+        yield {'cliplimit': cliplimit}, fun._interpolar_clahe(img, tablas, pesos)
+
+_BARRIDOS = {
+    'highboost': _barrido_highboost,
+    'gradiente_laplaciano': _barrido_gradiente,
+    'filtro_mediana': _barrido_mediana,
+    'clahe': _barrido_clahe,
+}
+
+_PARAMETROS = {operacion: set(valores) for operacion, valores in REJILLA_EJEMPLO.items()}
+
+def barrido(img, rejilla):
+    """
+    Recorre todas las combinaciones de la rejilla para una imagen.
+
+    Parámetros:
+    img (numpy.ndarray): Imagen en 2D (uint8).
+    rejilla (dict): {operacion: {parametro: [valores]}}, ver REJILLA_EJEMPLO.
+
+    Retorna:
+    generador de (operacion, params, imagen_resultado)
+    """
+    # Se valida toda la rejilla antes de producir el primer resultado
+    for operacion, valores in rejilla.items():
+        if operacion not in _BARRIDOS:
+            raise ValueError(f"Operación desconocida: '{operacion}'. Opciones: {sorted(_BARRIDOS)}")
+        for nombre in valores:
+            if nombre not in _PARAMETROS[operacion]:
+                raise ValueError(f"Parámetro desconocido para '{operacion}': '{nombre}'. "
+                                 f"Opciones: {sorted(_PARAMETROS[operacion])}")
+
+    for operacion, valores in rejilla.items():
+        for params, resultado in _BARRIDOS[operacion](img, valores):
+            yield operacion, params, resultado
+
+def barrido_arreglo(img, rejilla):
+    """Igual que barrido() pero devuelve {operacion: {etiqueta: imagen}}."""
+    resultados = {}
+    for operacion, params, resultado in barrido(img, rejilla):
+        resultados.setdefault(operacion, {})[etiqueta(params)] = resultado
+    return resultados
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Barrido de parámetros del segundo parcial')
+    parser.add_argument('--entrada', default='resultados_procesamiento_MuchoFuego/01_EscalaGris')
+    parser.add_argument('--salida', default='resultados_barrido_Parcial2')
+    parser.add_argument('--k', type=float, nargs='+', default=REJILLA_EJEMPLO['highboost']['k'])
+    parser.add_argument('--ksize', type=int, nargs='+', default=REJILLA_EJEMPLO['highboost']['ksize'])
+    parser.add_argument('--gamma', type=float, nargs='+',
+                        default=REJILLA_EJEMPLO['gradiente_laplaciano']['gamma'])
+    parser.add_argument('--S_max', type=int, nargs='+', default=REJILLA_EJEMPLO['filtro_mediana']['S_max'])
+    parser.add_argument('--cliplimit', type=int, nargs='+', default=REJILLA_EJEMPLO['clahe']['cliplimit'])
+    args = parser.parse_args()
+
+    rejilla = {
+        'highboost': {'k': args.k, 'ksize': args.ksize},
+        'gradiente_laplaciano': {'gamma': args.gamma},
+        'filtro_mediana': {'S_max': args.S_max},
+        'clahe': {'cliplimit': args.cliplimit},
+    }
+
+    tipos = ('*.jpg', '*.png', '*.jpeg')
+    lista_imagenes = []
+    for ext in tipos:
+        lista_imagenes.extend(glob.glob(os.path.join(args.entrada, ext)))
+
+    if not lista_imagenes:
+        print(f"Error: No se encontraron imágenes en '{args.entrada}'")
+        exit()
+
+    n = sum(len(list(_combinaciones(v))) for v in rejilla.values())
+    print(f"Procesando {len(lista_imagenes)} imágenes x {n} combinaciones...")
+
+    # Estructura: <salida>/<operacion>/<etiqueta>/<imagen>
+    for img_path in lista_imagenes:
+        filename = os.path.basename(img_path)
+        img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            print(f"No se pudo leer: {filename}")
+            continue
+
+        for operacion, params, resultado in barrido(img, rejilla):
+            carpeta = os.path.join(args.salida, operacion, etiqueta(params))
+            os.makedirs(carpeta, exist_ok=True)
+            cv2.imwrite(os.path.join(carpeta, filename), resultado)
+
+    print("¡Proceso finalizado exitosamente!")
@@ -0,0 +1,95 @@
+import argparse
+import time
+import numpy as np
+import cv2
+import funciones_Parcial2 as fun
+
+try:
+    import kernels_numba
+except ImportError:
+    kernels_numba = None
+
+# Benchmark del filtro de mediana: tiempo contra tamaño de ventana.
+#
+#   ventana fija   mín/mediana/máx de una ventana S x S
+#                  (np.median por ventanas vs. histogramas por columna)
+#   adaptativo     filtro_mediana completo con S_max creciente sobre una
+#                  imagen con mucho ruido de sal y pimienta
+#
+# Los métodos cuyo costo crece con S se omiten a partir de --limite segundos.
+
+def _cronometrar(funcion, repeticiones=1):
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def _imagen(ruta, lado, ruido):
+    if ruta:
+        img = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            raise SystemExit(f"No se pudo leer: {ruta}")
+    else:
+        # Degradado suave con textura, como una escena sin bordes fuertes
+        y, x = np.indices((lado, lado))
+        img = (128 + 60 * np.sin(x / 17) * np.cos(y / 23)).astype(np.uint8)
+
+    rng = np.random.default_rng(0)
+    img = img.copy()
+    img[rng.random(img.shape) < ruido / 2] = 0
+    img[rng.random(img.shape) < ruido / 2] = 255
+    return img
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark del filtro de mediana')
+    parser.add_argument('--imagen', default=None, help='Imagen de prueba (por defecto, sintética)')
+    parser.add_argument('--lado', type=int, default=512, help='Lado de la imagen sintética')
+    parser.add_argument('--ruido', type=float, default=0.6, help='Fracción de píxeles con ruido')
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[3, 7, 11, 15, 21, 31])
+    parser.add_argument('--limite', type=float, default=20,
+                        help='Segundos a partir de los cuales se deja de medir un método')
+    args = parser.parse_args()
+
+    img = _imagen(args.imagen, args.lado, args.ruido)
+    pad = max(args.tamanos) // 2
+    img_pad = np.pad(img, pad, mode='reflect')
+    print(f"Imagen {img.shape[1]}x{img.shape[0]}, ruido {args.ruido:.0%}\n")
+
+    if kernels_numba is not None:
+        # Compilamos antes de medir
+        kernels_numba.estadisticas_histograma(img_pad, pad, img.shape, 3)
+        kernels_numba.filtro_mediana(img[:16, :16], 3)
+
+    fijos = {
+        'np.median por ventanas': lambda S: fun._estadisticas_mediana(
+            img_pad.astype(np.float32), pad, img.shape, S),
+        'histogramas (numpy)': lambda S: fun.estadisticas_histograma(img_pad, pad, img.shape, S),
+    }
+    if kernels_numba is not None:
+        fijos['histogramas (numba)'] = lambda S: kernels_numba.estadisticas_histograma(
+            img_pad, pad, img.shape, S)
+
+    adaptativos = {
+        'filtro_mediana (referencia)': lambda S: fun.filtro_mediana(img, S),
+        'filtro_medianaOpt': lambda S: fun.filtro_medianaOpt(img, S),
+    }
+    if kernels_numba is not None:
+        adaptativos['numba'] = lambda S: kernels_numba.filtro_mediana(img, S)
+
+    for titulo, metodos in (('Ventana fija (S)', fijos), ('Adaptativo (S_max)', adaptativos)):
+        print(titulo)
+        print(f"{'método':<30}" + ''.join(f"{S:>9}" for S in args.tamanos))
+        for nombre, metodo in metodos.items():
+            fila = f"{nombre:<30}"
+            lento = False
+            for S in args.tamanos:
+                if lento:
+                    fila += f"{'-':>9}"
+                    continue
+                t = _cronometrar(lambda: metodo(S))
+                lento = t > args.limite
+                fila += f"{t:>8.3f}s"
+            print(fila)
+        print()
@@ -0,0 +1,126 @@
+import asyncio
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Cliente de prueba de carga para servicio.py.
+#
+# Modo 'servicio': lanza N peticiones concurrentes contra el servicio local.
+# Modo 'directo': procesa cada petición en un proceso nuevo que ejecuta el
+# mismo código que los trabajadores del servicio (servicio._aplicar con el
+# mismo --backend) sobre una sola imagen. Así la diferencia entre ambos modos
+# es solo el arranque en frío y el procesar de a una imagen.
+# Con ambos modos se imprime el rendimiento (peticiones por segundo) para compararlos.
+
+_DIRECTO = '''
+import sys, cv2
+import servicio
+servicio._cargar_modulos(sys.argv[3] or None)
+img = cv2.imread(sys.argv[1], cv2.IMREAD_GRAYSCALE)
+out = servicio._aplicar(sys.argv[2], {}, img)
+sys.stdout.buffer.write(cv2.imencode('.png', out)[1].tobytes())
+'''
+
+async def _peticion(reader, writer, host, ruta, cuerpo):
+    writer.write((f"POST {ruta} HTTP/1.1\r\nHost: {host}\r\n"
+                  f"Content-Length: {len(cuerpo)}\r\n\r\n").encode('latin-1') + cuerpo)
+    await writer.drain()
+
+    estado = (await reader.readline()).decode('latin-1')
+    largo = 0
+    while True:
+        h = await reader.readline()
+        if h in (b'\r\n', b''): break
+        nombre, _, valor = h.decode('latin-1').partition(':')
+        if nombre.strip().lower() == 'content-length': largo = int(valor)
+    await reader.readexactly(largo)
+    return estado.split(' ', 2)[1] == '200'
+
+async def carga_servicio(host, puerto, imagenes, op, total, concurrencia):
+    # Cada conexión (keep-alive) toma peticiones de una cola compartida
+    cola = asyncio.Queue()
+    for i in range(total):
+        cola.put_nowait(imagenes[i % len(imagenes)])
+    ok = 0
+
+    async def conexion():
+        nonlocal ok
+        reader, writer = await asyncio.open_connection(host, puerto)
+        try:
+            while not cola.empty():
+                correcta = await _peticion(reader, writer, host, f"/procesar?op={op}", cola.get_nowait())
+                ok += correcta
+        finally:
+            writer.close()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexion() for _ in range(concurrencia)))
+    return ok, time.perf_counter() - inicio
+
+async def carga_directa(rutas, op, total, concurrencia, backend=None):
+    src = os.path.dirname(os.path.abspath(__file__))
+    semaforo = asyncio.Semaphore(concurrencia)
+    ok = 0
+
+    async def una(ruta):
+        nonlocal ok
+        async with semaforo:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, '-c', _DIRECTO, ruta, op, backend or '', cwd=src,
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            await proc.communicate()
+            ok += proc.returncode == 0
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una(rutas[i % len(rutas)]) for i in range(total)))
+    return ok, time.perf_counter() - inicio
+
+async def metricas(host, puerto):
+    reader, writer = await asyncio.open_connection(host, puerto)
+    writer.write(f"GET /metricas HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+    respuesta = await reader.read()
+    writer.close()
+    return json.loads(respuesta.split(b'\r\n\r\n', 1)[1])
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga del servicio de realce')
+    parser.add_argument('carpeta', help='Carpeta con imágenes de entrada')
+    parser.add_argument('--modo', choices=('servicio', 'directo', 'ambos'), default='ambos')
+    parser.add_argument('--op', default='clahe')
+    parser.add_argument('--peticiones', type=int, default=200)
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--backend', default=None,
+                        help='Backend del modo directo; debe ser el mismo con el que se lanzó el servicio')
+    args = parser.parse_args()
+
+    rutas = []
+    for ext in ('*.jpg', '*.png', '*.jpeg'):
+        rutas.extend(glob.glob(os.path.join(args.carpeta, ext)))
+    rutas = [os.path.abspath(r) for r in sorted(rutas)]
+    if not rutas:
+        print(f"Error: No se encontraron imágenes en '{args.carpeta}'")
+        exit()
+
+    resultados = {}
+    if args.modo in ('servicio', 'ambos'):
+        imagenes = [open(r, 'rb').read() for r in rutas]
+        ok, t = asyncio.run(carga_servicio(args.host, args.puerto, imagenes, args.op,
+                                           args.peticiones, args.concurrencia))
+        resultados['servicio'] = args.peticiones / t
+        print(f"servicio: {ok}/{args.peticiones} correctas en {t:.2f} s -> {resultados['servicio']:.1f} pet/s")
+        print("métricas:", json.dumps(asyncio.run(metricas(args.host, args.puerto))))
+
+    if args.modo in ('directo', 'ambos'):
+        ok, t = asyncio.run(carga_directa(rutas, args.op, args.peticiones,
+                                          args.concurrencia, args.backend))
+        resultados['directo'] = args.peticiones / t
+        print(f"directo:  {ok}/{args.peticiones} correctas en {t:.2f} s -> {resultados['directo']:.1f} pet/s")
+
+    if len(resultados) == 2:
+        print(f"aceleración del servicio: {resultados['servicio'] / resultados['directo']:.1f}x")
@@ -0,0 +1,211 @@
+import os
+import json
+import argparse
+import socket
+import cv2
+
+# Detección de imágenes casi duplicadas (p. ej. cuadros consecutivos de un video).
+#
+# A cada imagen se le calcula un hash perceptual de 64 bits (dHash) y dos
+# imágenes se consideran casi iguales si sus hashes difieren en pocos bits
+# (distancia de Hamming). Los hashes se guardan en un índice JSON para que
+# las siguientes corridas solo calculen el de los archivos nuevos o modificados.
+
+#--------------------------------------------#
+#------------ HASH PERCEPTUAL ---------------#
+#--------------------------------------------#
+
+def hash_perceptual(img):
+    """
+    dHash: la imagen reducida a 9x8 y un bit por cada par de vecinos horizontales
+    (1 si el de la derecha es más claro). Tolera compresión, ruido y cambios de brillo.
+    """
+    if len(img.shape) == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    reducida = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA).astype(int)
+    bits = (reducida[:, 1:] > reducida[:, :-1]).ravel()
+    return int(''.join('1' if b else '0' for b in bits), 2)
+
+def distancia(a, b):
+    """Distancia de Hamming entre dos hashes."""
+    return bin(a ^ b).count('1')
+
+#--------------------------------------------#
+#----------- ÍNDICE DE BÚSQUEDA -------------#
+#--------------------------------------------#
+
+class IndiceHamming:
+    """
+    Búsqueda de hashes a distancia <= umbral sin comparar contra todos.
+
+    El hash se divide en umbral+1 bandas: si dos hashes difieren en a lo sumo
+    'umbral' bits, al menos una banda es idéntica (principio del palomar).
+    Solo se comparan los hashes que comparten alguna banda.
+    """
+    def __init__(self, umbral, bits=64):
+        if not 0 <= umbral < bits:
+            raise ValueError(f"El umbral debe estar entre 0 y {bits - 1}.")
+        self.umbral = umbral
+        n = umbral + 1
+        limites = [bits * i // n for i in range(n + 1)]
+        self.bandas = list(zip(limites[:-1], limites[1:]))
+        self.tablas = [{} for _ in self.bandas]
+        self.valores = {}
+
+    def _claves(self, h):
+        return [(h >> ini) & ((1 << (fin - ini)) - 1) for ini, fin in self.bandas]
+
+    def agregar(self, h, valor):
+        self.valores[valor] = h
+        for tabla, clave in zip(self.tablas, self._claves(h)):
+            tabla.setdefault(clave, []).append(valor)
+
+    def buscar(self, h):
+        """Devuelve el valor más cercano a distancia <= umbral, o None."""
+        mejor, mejor_d = None, self.umbral + 1
+        vistos = set()
+        for tabla, clave in zip(self.tablas, self._claves(h)):
+            for valor in tabla.get(clave, ()):
+                if valor in vistos: continue
+                vistos.add(valor)
+                d = distancia(h, self.valores[valor])
+                if d < mejor_d:
+                    mejor, mejor_d = valor, d
+        return mejor
+
+#--------------------------------------------#
+#-------- ÍNDICE PERSISTENTE EN DISCO -------#
+#--------------------------------------------#
+
+def cargar_hashes(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def guardar_hashes(path, hashes):
+    # Escritura atómica: varios trabajadores repartidos pueden escribir a la vez
+    carpeta = os.path.dirname(path)
+    if carpeta: os.makedirs(carpeta, exist_ok=True)
+    tmp = f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=1, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def calcular_hashes(rutas, path_indice=None):
+    """
+    Hash de cada ruta, reutilizando los del índice si el archivo no cambió
+    (mismo tamaño y fecha de modificación). Retorna {ruta: hash}; las rutas
+    que no se pueden leer quedan con hash None y no se guardan en el índice.
+    """
+    guardados = cargar_hashes(path_indice) if path_indice else {}
+    resultado = {}
+    nuevos = 0
+
+    for ruta in rutas:
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            resultado[ruta] = None
+            continue
+        clave = os.path.normpath(ruta)
+        previo = guardados.get(clave)
+        if previo and previo['tamano'] == st.st_size and previo['mtime'] == st.st_mtime:
+            resultado[ruta] = int(previo['hash'], 16)
+            continue
+
+        img = cv2.imread(ruta, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            resultado[ruta] = None
+            continue
+        h = hash_perceptual(img)
+        guardados[clave] = {'hash': f"{h:016x}", 'tamano': st.st_size, 'mtime': st.st_mtime}
+        resultado[ruta] = h
+        nuevos += 1
+
+    if path_indice and nuevos:
+        guardar_hashes(path_indice, guardados)
+    return resultado
+
+def agrupar_duplicados(rutas, umbral=4, path_indice=None):
+    """
+    Separa las rutas en representantes y casi duplicados.
+
+    Las rutas se recorren en orden; una imagen a distancia <= umbral de un
+    representante anterior se marca como duplicado de ese representante.
+    Las que no se pueden leer se dejan como representantes, para que el
+    driver reporte el error al procesarlas.
+
+    Retorna:
+    tupla: (lista de representantes, {duplicado: representante})
+    """
+    hashes = calcular_hashes(rutas, path_indice)
+    indice = IndiceHamming(umbral)
+    unicas, duplicados = [], {}
+
+    for ruta in sorted(hashes):
+        h = hashes[ruta]
+        if h is None:
+            unicas.append(ruta)
+            continue
+        representante = indice.buscar(h)
+        if representante is None:
+            indice.agregar(h, ruta)
+            unicas.append(ruta)
+        else:
+            duplicados[ruta] = representante
+
+    return unicas, duplicados
+
+#--------------------------------------------#
+#------------ USO DESDE LOS DRIVERS ---------#
+#--------------------------------------------#
+
+def _umbral(valor):
+    umbral = int(valor)
+    if not 0 <= umbral < 64:
+        raise argparse.ArgumentTypeError("debe estar entre 0 y 63")
+    return umbral
+
+def agregar_argumentos(parser):
+    grupo = parser.add_argument_group('casi duplicados')
+    grupo.add_argument('--umbral-duplicados', type=_umbral, default=None,
+                       help='Omitir imágenes a esta distancia de Hamming (de 64 bits) o menos '
+                            'de una ya procesada (desactivado por defecto)')
+    grupo.add_argument('--duplicados', choices=('omitir', 'colapsar'), default='omitir',
+                       help="'colapsar' además guarda <salida>/duplicados.json con el "
+                            "representante de cada imagen omitida")
+    grupo.add_argument('--indice-hashes', default=None,
+                       help='Archivo del índice de hashes (por defecto <salida>/indice_hashes.json)')
+
+def filtrar(args, lista_imagenes):
+    """Aplica las opciones de agregar_argumentos a la lista de imágenes del driver."""
+    if args.umbral_duplicados is None:
+        return lista_imagenes
+
+    path_indice = args.indice_hashes or os.path.join(args.salida, 'indice_hashes.json')
+    unicas, duplicados = agrupar_duplicados(lista_imagenes, args.umbral_duplicados, path_indice)
+    print(f"Casi duplicados: se omiten {len(duplicados)} de {len(lista_imagenes)} imágenes.")
+
+    if args.duplicados == 'colapsar':
+        mapa = {os.path.basename(d): os.path.basename(r) for d, r in sorted(duplicados.items())}
+        guardar_hashes(os.path.join(args.salida, 'duplicados.json'), mapa)
+    return unicas
+
+if __name__ == '__main__':
+    import glob
+    parser = argparse.ArgumentParser(description='Lista los casi duplicados de una carpeta')
+    parser.add_argument('carpeta')
+    parser.add_argument('--umbral', type=_umbral, default=4)
+    parser.add_argument('--indice-hashes', default=None)
+    args = parser.parse_args()
+
+    rutas = []
+    for ext in ('*.jpg', '*.png', '*.jpeg'):
+        rutas.extend(glob.glob(os.path.join(args.carpeta, ext)))
+
+    unicas, duplicados = agrupar_duplicados(rutas, args.umbral, args.indice_hashes)
+    for d, r in sorted(duplicados.items()):
+        print(f"{d} ~ {r}")
+    print(f"{len(unicas)} únicas, {len(duplicados)} casi duplicadas de {len(rutas)} imágenes")
@@ -202,4 +202,141 @@ def cutmix(img_dest, img_src, beta=1.0):
     new_img = img_dest.copy()
     new_img[bby1:bby2, bbx1:bbx2] = img_src[bby1:bby2, bbx1:bbx2]
     
-    return new_img
\ No newline at end of file
+    return new_img
+
+# --- 2g. Transformación Afín Compuesta ---
+# Cada operación geométrica se expresa como una matriz homogénea 3x3 (origen -> destino).
+# Se multiplican todas y la imagen se remuestrea UNA sola vez, sin importar
+# cuántas operaciones se encadenen.
+
+def matriz_volteado(w, h, modo='h'):
+    if modo == 'h':
+        return np.array([[-1, 0, w - 1], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+    elif modo == 'v':
+        return np.array([[1, 0, 0], [0, -1, h - 1], [0, 0, 1]], dtype=np.float64)
+    return np.eye(3)
+
+def matriz_rotacion(angulo_grados, centro):
+    # Mismo sentido de giro que rotacion()
+    theta = np.radians(angulo_grados)
+    cx, cy = centro
+    c, s = np.cos(theta), np.sin(theta)
+    return np.array([[c, -s, cx - c * cx + s * cy],
+                     [s,  c, cy - s * cx - c * cy],
+                     [0,  0, 1]], dtype=np.float64)
+
+def matriz_traslacion(tx, ty):
+    return np.array([[1, 0, tx], [0, 1, ty], [0, 0, 1]], dtype=np.float64)
+
+def matriz_escalamiento(sx, sy=None, centro=(0, 0)):
+    # Con centro=(0, 0) coincide con escalamiento()
+    if sy is None: sy = sx
+    cx, cy = centro
+    return np.array([[sx, 0, cx * (1 - sx)],
+                     [0, sy, cy * (1 - sy)],
+                     [0, 0, 1]], dtype=np.float64)
+
+def matriz_cizallamiento(shx, shy=0, centro=(0, 0)):
+    # x' = x + shx * (y - cy),  y' = y + shy * (x - cx)
+    cx, cy = centro
+    return np.array([[1, shx, -shx * cy],
+                     [shy, 1, -shy * cx],
+                     [0, 0, 1]], dtype=np.float64)
+
+def componer_afin(*matrices):
+    """
+    Multiplica las matrices en el orden en que se aplican
+    (la primera es la primera transformación) y devuelve la matriz 2x3.
+    """
+    M = np.eye(3)
+    for A in matrices:
+        A = np.asarray(A, dtype=np.float64)
+        if A.shape == (2, 3):
+            A = np.vstack([A, [0, 0, 1]])
+        M = A @ M
+    return M[:2]
+
+_BORDES_CV = {
+    'constante': cv2.BORDER_CONSTANT,
+    'replicar':  cv2.BORDER_REPLICATE,
+    'reflejar':  cv2.BORDER_REFLECT_101,
+    'envolver':  cv2.BORDER_WRAP,
+}
+
+def _indices_borde(idx, n, borde):
+    # Lleva índices fuera de la imagen a índices válidos según el modo de borde
+    if borde == 'replicar':
+        return np.clip(idx, 0, n - 1)
+    if borde == 'envolver':
+        return np.mod(idx, n)
+    if borde == 'reflejar':
+        if n == 1: return np.zeros_like(idx)
+        periodo = 2 * n - 2
+        idx = np.mod(idx, periodo)
+        return np.where(idx >= n, periodo - idx, idx)
+    return np.clip(idx, 0, n - 1) # 'constante': la máscara se aplica aparte
+
+def _ajustar_salida(M, h, w):
+    # Caja envolvente de las esquinas transformadas: traslada para que todo quede visible
+    esquinas = np.array([[0, 0, 1], [w - 1, 0, 1], [0, h - 1, 1], [w - 1, h - 1, 1]], dtype=np.float64)
+    destino = esquinas @ M.T
+    x_min, y_min = np.floor(destino.min(axis=0))
+    x_max, y_max = np.ceil(destino.max(axis=0))
+    M = componer_afin(M, matriz_traslacion(-x_min, -y_min))
+    return M, (int(y_max - y_min) + 1, int(x_max - x_min) + 1)
+
+def transformacion_afin(img, M, tam_salida=None, borde='constante', valor=0, motor='opencv'):
+    """
+    Aplica una matriz afín 2x3 (origen -> destino) con un único remuestreo bilineal.
+    
+    tam_salida: (alto, ancho), None para conservar el tamaño de entrada o
+        'ajustar' para que la imagen transformada completa quepa en la salida.
+    borde: 'constante' (rellena con valor), 'replicar', 'reflejar' o 'envolver'.
+    motor: 'opencv' (cv2.warpAffine) o 'numpy' (mapeo inverso vectorizado).
+    """
+    if borde not in _BORDES_CV:
+        raise ValueError(f"Modo de borde desconocido: '{borde}'. Opciones: {list(_BORDES_CV)}")
+
+    h, w = img.shape[:2]
+    M = np.asarray(M, dtype=np.float64)[:2]
+    if tam_salida is None:
+        tam_salida = (h, w)
+    elif tam_salida == 'ajustar':
+        M, tam_salida = _ajustar_salida(M, h, w)
+    h_out, w_out = tam_salida
+
+    if motor == 'opencv':
+        return cv2.warpAffine(img, M, (w_out, h_out), flags=cv2.INTER_LINEAR,
+                              borderMode=_BORDES_CV[borde], borderValue=valor)
+    if motor != 'numpy':
+        raise ValueError(f"Motor desconocido: '{motor}'. Opciones: ['opencv', 'numpy']")
+
+    # Mapeo inverso: para cada píxel destino, su coordenada en la imagen origen
+    Minv = cv2.invertAffineTransform(M)
+    y_idxs, x_idxs = np.indices((h_out, w_out), dtype=np.float64)
+    x_src = Minv[0, 0] * x_idxs + Minv[0, 1] * y_idxs + Minv[0, 2]
+    y_src = Minv[1, 0] * x_idxs + Minv[1, 1] * y_idxs + Minv[1, 2]
+
+    x0 = np.floor(x_src).astype(int)
+    y0 = np.floor(y_src).astype(int)
+    fx = x_src - x0
+    fy = y_src - y0
+
+    # Pesos bilineales de los 4 vecinos y sus índices ya ajustados al borde
+    vecinos = ((y0, x0, (1 - fx) * (1 - fy)), (y0 + 1, x0, (1 - fx) * fy),
+               (y0, x0 + 1, fx * (1 - fy)), (y0 + 1, x0 + 1, fx * fy))
+
+    intensidad = 0
+    for yy, xx, peso in vecinos:
+        pixel = img[_indices_borde(yy, h, borde), _indices_borde(xx, w, borde)].astype(np.float64)
+        if borde == 'constante':
+            fuera = (xx < 0) | (xx >= w) | (yy < 0) | (yy >= h)
+            pixel[fuera] = valor
+        if img.ndim == 3:
+            peso = peso[..., None]
+        intensidad = intensidad + peso * pixel
+
+    if np.issubdtype(img.dtype, np.integer):
+        info = np.iinfo(img.dtype)
+        intensidad = np.clip(np.round(intensidad), info.min, info.max)
+    return intensidad.astype(img.dtype)
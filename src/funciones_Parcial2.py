@@ -125,14 +125,28 @@ def clahe(image):
     
     return IMG
 
-def filtrado(imagen):
-    height, width = imagen.shape
-    
+def ruido_sal_pimienta(imagen, amount=0.05):
     # random_noise devuelve flotantes entre 0.0 y 1.0
-    J_flotante = util.random_noise(imagen, mode='s&p', amount=0.05)
+    J_flotante = util.random_noise(imagen, mode='s&p', amount=amount)
     
     # Re-escalamos de vuelta al rango 0-255 y mantenemos formato float64 para los cálculos
-    J = (J_flotante * 255).astype(np.float64)
+    return (J_flotante * 255).astype(np.float64)
+
+def filtrado(imagen):
+    J = ruido_sal_pimienta(imagen)
+    return filtro_adaptativo_local(J)
+
+def filtro_adaptativo_local(J):
+    """
+    Filtro adaptativo local 3x3 (versión de referencia, píxel por píxel).
+    
+    Parámetros:
+    J (numpy.ndarray): Imagen en 2D (float64) ya contaminada con ruido.
+    
+    Retorna:
+    numpy.ndarray: Imagen filtrada (float64).
+    """
+    height, width = J.shape
     
     var_total = np.var(J)
     
@@ -204,8 +218,18 @@ def highboost(image, k=1.5, ksize=5):
     f = image.astype(np.float32)
 
     # 2) Suavizado promedio (box)
+    f_bar = suavizado_caja(f, ksize)
+
+    # 3-5) Máscara, highboost y recorte
+    return highboost_desde(f, f_bar, k)
+
+def suavizado_caja(f, ksize):
     kernel = np.ones((ksize, ksize), dtype=np.float32) / (ksize * ksize)
-    f_bar = cv2.filter2D(f, -1, kernel)
+    return cv2.filter2D(f, -1, kernel)
+
+def highboost_desde(f, f_bar, k):
+    # Etapa final del highboost a partir del suavizado ya calculado
+    # (permite reutilizar f_bar para varios valores de k)
 
     # 3) Máscara
     mask = f - f_bar
@@ -234,6 +258,20 @@ def gradiente_laplaciano(imagen_gris, gamma=0.8):
     Retorna:
     tupla: (imagen_original, laplaciano, gradiente_suavizado, imagen_final)
     """
+    img, lap, mag_norm, g_norm = gradiente_laplaciano_base(imagen_gris)
+
+    # 7. Aplicar corrección Gamma
+    g_final = g_norm ** gamma
+    
+    return img, lap, mag_norm, g_final
+
+def gradiente_laplaciano_base(imagen_gris):
+    """
+    Pasos 1-6 de gradiente_laplaciano: todo lo que no depende de gamma.
+    
+    Retorna:
+    tupla: (imagen_original, laplaciano, gradiente_suavizado, imagen_normalizada)
+    """
     img = imagen_gris.astype(np.float64)
 
     # 2. Imagen con Laplaciano
@@ -263,14 +301,12 @@ def gradiente_laplaciano(imagen_gris, gamma=0.8):
     # 6. Sumar la máscara a la imagen original
     g = img + Mask
 
-    # 7. Aplicar corrección Gamma
+    # Normalización a [0, 1] previa a la corrección Gamma
     min_g = np.min(g)
     max_g = np.max(g)
     g_norm = (g - min_g) / (max_g - min_g) if (max_g - min_g) > 0 else g
     
-    g_final = g_norm ** gamma
-    
-    return img, lap, mag_norm, g_final
+    return img, lap, mag_norm, g_norm
 
 #--------------------------------------------#
 #------ FILTRO DE MEDIANA ADAPTATIVO --------#
@@ -355,59 +391,43 @@ def filtro_mediana(img, S_max):
 #--------------------------------------------#
 #---------------- CLAHE OPT------------------#
 #--------------------------------------------#
-def claheOpt(image):
+def _histogramas_clahe(image):
+    # Histogramas de los 4 cuadrantes ecualizados (no dependen del cliplimit)
     height, width = image.shape
     tam1 = height // 2
     tam2 = width // 2
     
-    PARTE1 = image[0:tam1, 0:tam2]
-    PARTE2 = image[tam1:height, 0:tam2]
-    PARTE3 = image[0:tam1, tam2:width]
-    PARTE4 = image[tam1:height, tam2:width]
+    PARTES = (image[0:tam1, 0:tam2],
+              image[tam1:height, 0:tam2],
+              image[0:tam1, tam2:width],
+              image[tam1:height, tam2:width])
     
-    cliplimit = 80
-    
-    EP1 = ecualizacion_histograma(PARTE1)
-    EP2 = ecualizacion_histograma(PARTE2)
-    EP3 = ecualizacion_histograma(PARTE3)
-    EP4 = ecualizacion_histograma(PARTE4)
-    
-    freq = np.bincount(EP1.flatten(), minlength=256)
-    freq2 = np.bincount(EP2.flatten(), minlength=256)
-    freq3 = np.bincount(EP3.flatten(), minlength=256)
-    freq4 = np.bincount(EP4.flatten(), minlength=256)
+    freqs = [np.bincount(ecualizacion_histogramaOpt(parte).ravel(), minlength=256)
+             for parte in PARTES]
+    return freqs, tam1 * tam2
 
-    # Vectorización del recorte
-    recorte1 = np.where(freq > cliplimit, cliplimit, freq)
-    sum1 = np.sum(freq - recorte1)
-    
-    recorte2 = np.where(freq2 > cliplimit, cliplimit, freq2)
-    sum2 = np.sum(freq2 - recorte2)
-    
-    recorte3 = np.where(freq3 > cliplimit, cliplimit, freq3)
-    sum3 = np.sum(freq3 - recorte3)
-    
-    recorte4 = np.where(freq4 > cliplimit, cliplimit, freq4)
-    sum4 = np.sum(freq4 - recorte4)
+def _tablas_clahe_desde(freqs, area, cliplimit):
+    tablas = []
+    for freq in freqs:
+        # Vectorización del recorte
+        recorte = np.where(freq > cliplimit, cliplimit, freq)
+        suma = int(np.sum(freq - recorte))
 
-    # Redistribución
-    recorte1 += int(sum1 // 256)
-    recorte2 += int(sum2 // 256)
-    recorte3 += int(sum3 // 256)
-    recorte4 += int(sum4 // 256)
-        
-    for i in range(int(sum1 % 256)): recorte1[i] += 1
-    for i in range(int(sum2 % 256)): recorte2[i] += 1
-    for i in range(int(sum3 % 256)): recorte3[i] += 1
-    for i in range(int(sum4 % 256)): recorte4[i] += 1
-        
-    # Transformaciones acumuladas vectorizadas
-    area = tam1 * tam2
-    T1 = np.cumsum(recorte1) / area * 255
-    T2 = np.cumsum(recorte2) / area * 255
-    T3 = np.cumsum(recorte3) / area * 255
-    T4 = np.cumsum(recorte4) / area * 255
+        # Redistribución (el residuo se reparte en los primeros niveles)
+        recorte += suma // 256
+        recorte[:suma % 256] += 1
+
+        # Transformación acumulada vectorizada
+        tablas.append(np.cumsum(recorte) / area * 255)
     
+    # Orden: superior izquierda, inferior izquierda, superior derecha, inferior derecha
+    return tablas
+
+def _tablas_clahe(image, cliplimit=80):
+    freqs, area = _histogramas_clahe(image)
+    return _tablas_clahe_desde(freqs, area, cliplimit)
+
+def _pesos_clahe(height, width):
     # --- VECTORIZACIÓN DE LA INTERPOLACIÓN BILINEAL ---
     # Creamos mallas de coordenadas para evitar el doble for
     dy = np.linspace(0, 1, height).reshape(height, 1)
@@ -417,6 +437,11 @@ def claheOpt(image):
     w2 = dx * (1 - dy)
     w3 = (1 - dx) * dy
     w4 = dx * dy
+    return w1, w2, w3, w4
+
+def _interpolar_clahe(image, tablas, pesos):
+    T1, T2, T3, T4 = tablas
+    w1, w2, w3, w4 = pesos
 
     # Mapeo directo usando advanced indexing de NumPy
     val1 = T1[image]
@@ -428,30 +453,276 @@ def claheOpt(image):
     
     return np.uint8(IMG)
 
+def claheOpt(image, cliplimit=80):
+    height, width = image.shape
+    tablas = _tablas_clahe(image, cliplimit)
+    return _interpolar_clahe(image, tablas, _pesos_clahe(height, width))
 
 #--------------------------------------------#
-#--------FILTRO ADAPTATIVO LOCAL OPT---------#
+#---------- ECUALIZACIÓN OPT ----------------#
 #--------------------------------------------#
 
-def filtradoOpt(imagen):
-    # random_noise devuelve flotantes entre 0.0 y 1.0
-    J_flotante = util.random_noise(imagen, mode='s&p', amount=0.05)
-    J = (J_flotante * 255).astype(np.float64)
+def ecualizacion_histogramaOpt(image):
+    nk = np.bincount(image.ravel(), minlength=256)
+
+    # CDF y transformación T en una sola pasada (mismo redondeo que la versión de referencia)
+    cdf = np.cumsum(nk / image.size)
+    T = np.round(255 * cdf).astype(np.uint8)
+
+    # Aplicar la transformación como tabla de búsqueda
+    return T[image]
+
+#--------------------------------------------#
+#------ FILTRO DE MEDIANA ADAPTATIVO OPT ----#
+#--------------------------------------------#
+
+def _estadisticas_mediana(img_pad, pad_max, forma, S, bloque=2**24):
+    # (z_min, z_med, z_max) de las ventanas S x S, procesando por bloques de filas
+    # para no materializar todas las ventanas a la vez
+    filas, columnas = forma
+    a = pad_max - S // 2
+    region = img_pad[a:a + filas + S - 1, a:a + columnas + S - 1]
+    ventanas = np.lib.stride_tricks.sliding_window_view(region, (S, S))
+
+    z_min = np.empty(forma, dtype=np.float32)
+    z_med = np.empty(forma, dtype=np.float32)
+    z_max = np.empty(forma, dtype=np.float32)
+    paso = max(1, bloque // (columnas * S * S))
+    for i in range(0, filas, paso):
+        v = ventanas[i:i + paso]
+        z_min[i:i + paso] = v.min(axis=(2, 3))
+        z_max[i:i + paso] = v.max(axis=(2, 3))
+        z_med[i:i + paso] = np.median(v, axis=(2, 3))
+
+    return z_min, z_med, z_max
+
+def mediana_adaptativa(z_xy, niveles, pendiente=None):
+    """
+    Lógica de crecimiento de ventana del filtro de mediana adaptativo, vectorizada.
     
-    var_total = np.var(J)
-    if var_total == 0: return J 
+    Parámetros:
+    z_xy (numpy.ndarray): Imagen original (float32).
+    niveles (iterable): (z_min, z_med, z_max) para S = 3, 5, ..., S_max en orden.
+        Puede ser un generador: se deja de pedir niveles cuando todos los
+        píxeles ya están resueltos.
+    pendiente (numpy.ndarray): Máscara booleana opcional que se actualiza en el
+        lugar; un generador que la comparta puede calcular solo lo que falta.
+    
+    Retorna:
+    numpy.ndarray: Imagen filtrada (uint8).
+    """
+    salida = np.copy(z_xy)
+    if pendiente is None:
+        pendiente = np.ones(z_xy.shape, dtype=bool)
+    z_med = None
+
+    for z_min, z_med, z_max in niveles:
+        # Nivel A: la mediana no es un impulso
+        nivel_a = pendiente & (z_min < z_med) & (z_med < z_max)
+        # Nivel B: conservamos el píxel central si no es impulso, si no la mediana
+        centro_ok = (z_min < z_xy) & (z_xy < z_max)
+        salida[nivel_a] = np.where(centro_ok, z_xy, z_med)[nivel_a]
+        pendiente &= ~nivel_a
+        if not pendiente.any():
+            break
+    else:
+        # Con la ventana máxima la mediana sigue siendo impulso: se entrega igual
+        if z_med is not None:
+            salida[pendiente] = z_med[pendiente]
 
-    # --- VECTORIZACIÓN DEL CÁLCULO DE VARIANZA LOCAL ---
-    # Usamos la propiedad matemática: Varianza = E[X^2] - (E[X])^2
-    S = 3 # Tamaño de la ventana (3x3 como en tu for original)
+    return np.clip(salida, 0, 255).astype(np.uint8)
+
+# Ventana a partir de la cual los histogramas (costo fijo por píxel) le ganan
+# a np.median por ventanas (costo que crece con S) en bench_mediana.py
+S_HISTOGRAMA = 9
+
+def niveles_mediana(img, S_max, pendiente=None):
+    """
+    Generador de (z_min, z_med, z_max) para S = 3, 5, ..., S_max.
     
-    # Media local E[X]
-    media_local = cv2.blur(J, (S, S))
-    # Media de los cuadrados E[X^2]
-    media_cuadrados = cv2.blur(J**2, (S, S))
+    Las ventanas pequeñas usan np.median por ventanas; en imágenes uint8, a
+    partir de S_HISTOGRAMA se usa el motor de histogramas, y con pendiente
+    solo se calculan las filas que aún tienen píxeles sin resolver.
+    Se puede guardar en una lista y reutilizar: los primeros niveles de
+    S_max sirven para cualquier S_max menor.
+    """
+    if S_max % 2 == 0:
+        raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+
+    pad_max = S_max // 2
+    img_pad = np.pad(img.astype(np.float32), pad_max, mode='reflect')
+    img_pad_u8 = None
+
+    for S in range(3, S_max + 1, 2):
+        if img.dtype != np.uint8 or S < S_HISTOGRAMA:
+            yield _estadisticas_mediana(img_pad, pad_max, img.shape, S)
+            continue
+        if img_pad_u8 is None:
+            img_pad_u8 = np.pad(img, pad_max, mode='reflect')
+        filas = None if pendiente is None else pendiente.any(axis=1)
+        yield estadisticas_histograma(img_pad_u8, pad_max, img.shape, S, filas)
+
+def filtro_medianaOpt(img, S_max):
+    if S_max % 2 == 0:
+        raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+
+    pendiente = np.ones(img.shape, dtype=bool)
+    niveles = niveles_mediana(img, S_max, pendiente)
+    return mediana_adaptativa(img.astype(np.float32), niveles, pendiente)
+
+#--------------------------------------------#
+#--- MEDIANA POR HISTOGRAMAS (uint8) --------#
+#--------------------------------------------#
+
+def estadisticas_histograma(img_pad, pad_max, forma, S, filas=None):
+    """
+    Mínimo, mediana y máximo en ventanas S x S con histogramas por columna
+    (Perreault y Hébert, 2007). El costo por píxel no depende de S.
+    
+    Se mantiene un histograma de 256 niveles por cada columna, con las S filas
+    de la ventana. Al bajar una fila se quita un píxel y se agrega otro por
+    columna; el histograma de cada ventana es la suma de S histogramas de
+    columna, que se obtiene de una suma acumulada a lo largo de las columnas.
+    
+    Parámetros:
+    img_pad (numpy.ndarray): Imagen uint8 con padding reflejado de pad_max.
+    pad_max (int): Padding de img_pad.
+    forma (tuple): (filas, columnas) de la imagen sin padding.
+    S (int): Tamaño de la ventana (impar, S // 2 <= pad_max).
+    filas (numpy.ndarray): Máscara booleana opcional de las filas a calcular;
+        el resto queda en cero.
+    
+    Retorna:
+    tupla: (z_min, z_med, z_max) en float32
+    """
+    alto, columnas = forma
+    r = S // 2
+    a = pad_max - r
+    region = img_pad[a:a + alto + 2 * r, a:a + columnas + 2 * r]
+    ancho = columnas + 2 * r
+
+    z_min = np.zeros(forma, dtype=np.float32)
+    z_med = np.zeros(forma, dtype=np.float32)
+    z_max = np.zeros(forma, dtype=np.float32)
+    if filas is None:
+        filas = np.ones(alto, dtype=bool)
+    if not filas.any():
+        return z_min, z_med, z_max
+
+    cols = np.arange(ancho)
+    rango = S * S // 2 # Posición (desde 0) de la mediana en la ventana ordenada
+    acum = np.zeros((ancho + 1, 256), dtype=np.int32)
+
+    # Empezamos en la primera fila que hace falta
+    primera = int(np.argmax(filas))
+    ultima = alto - int(np.argmax(filas[::-1]))
+    hist_col = np.zeros((ancho, 256), dtype=np.int32)
+    for u in range(primera, primera + S):
+        hist_col[cols, region[u]] += 1
+
+    for i in range(primera, ultima):
+        if i > primera:
+            # Bajamos la ventana: sale la fila i-1 y entra la fila i+S-1 (una por columna)
+            hist_col[cols, region[i - 1]] -= 1
+            hist_col[cols, region[i + S - 1]] += 1
+        if not filas[i]:
+            continue
+
+        # Histograma de cada ventana = suma de S histogramas de columna consecutivos
+        np.cumsum(hist_col, axis=0, out=acum[1:])
+        kernel = acum[S:] - acum[:-S]
+
+        cdf = np.cumsum(kernel, axis=1)
+        z_med[i] = np.argmax(cdf > rango, axis=1)
+        z_min[i] = np.argmax(kernel > 0, axis=1)
+        z_max[i] = 255 - np.argmax(kernel[:, ::-1] > 0, axis=1)
+
+    return z_min, z_med, z_max
+
+#--------------------------------------------#
+#--- ESTADÍSTICAS LOCALES (IMAGEN INTEGRAL) -#
+#--------------------------------------------#
+
+def tablas_integrales(imagen, S_max):
+    """
+    Construye las tablas de suma acumulada (imágenes integrales) de la imagen
+    y de su cuadrado, con padding reflejado para ventanas de hasta S_max x S_max.
     
-    # Varianza local
-    var_local = media_cuadrados - (media_local**2)
+    Con estas dos tablas la suma de cualquier ventana se obtiene con 4 accesos,
+    así que la media y la varianza local cuestan O(1) por píxel sin importar S.
+    
+    Parámetros:
+    imagen (numpy.ndarray): Imagen de entrada en 2D (escala de grises).
+    S_max (int): Tamaño de la ventana más grande que se va a consultar (impar).
+    
+    Retorna:
+    dict: {'I': suma, 'I2': suma de cuadrados, 'pad': padding, 'forma': (alto, ancho),
+           'desplazamiento': valor restado antes de acumular}
+    """
+    if S_max % 2 == 0:
+        raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+
+    J = imagen.astype(np.float64)
+    pad = S_max // 2
+
+    # Restamos la media global antes de acumular: la varianza no cambia y
+    # las sumas quedan cerca de cero, lo que reduce el error de redondeo en E[X^2] - E[X]^2
+    desplazamiento = np.mean(J)
+    J_pad = np.pad(J - desplazamiento, pad, mode='reflect')
+
+    # cv2.integral2 devuelve tablas de (alto+1, ancho+1) con una fila/columna de ceros
+    I, I2 = cv2.integral2(J_pad, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+    return {'I': I, 'I2': I2, 'pad': pad, 'forma': J.shape, 'desplazamiento': desplazamiento}
+
+def _suma_ventana(tabla, pad, forma, S):
+    # Suma de la ventana S x S centrada en cada píxel: D - B - C + A
+    alto, ancho = forma
+    a = pad - S // 2
+    return (tabla[a + S:a + S + alto, a + S:a + S + ancho]
+            - tabla[a:a + alto, a + S:a + S + ancho]
+            - tabla[a + S:a + S + alto, a:a + ancho]
+            + tabla[a:a + alto, a:a + ancho])
+
+def estadisticas_locales(tablas, S):
+    """
+    Media y varianza local en ventanas S x S a partir de las tablas integrales.
+    
+    Parámetros:
+    tablas (dict): Resultado de tablas_integrales.
+    S (int): Tamaño de la ventana (impar y menor o igual que el S_max de las tablas).
+    
+    Retorna:
+    tupla: (media_local, var_local)
+    """
+    if S % 2 == 0 or S // 2 > tablas['pad']:
+        raise ValueError(f"Tamaño de ventana inválido para estas tablas: {S}")
+
+    n = S * S
+    suma = _suma_ventana(tablas['I'], tablas['pad'], tablas['forma'], S)
+    suma_cuadrados = _suma_ventana(tablas['I2'], tablas['pad'], tablas['forma'], S)
+
+    media = suma / n
+    # Varianza = E[X^2] - (E[X])^2 (evitamos negativos por redondeo)
+    var_local = np.maximum(suma_cuadrados / n - media**2, 0)
+
+    return media + tablas['desplazamiento'], var_local
+
+def estadisticas_multiescala(imagen, tamanos=(3, 7, 15, 31)):
+    """
+    Media y varianza local para varios tamaños de ventana usando las mismas tablas.
+    
+    Retorna:
+    dict: {S: (media_local, var_local)}
+    """
+    tablas = tablas_integrales(imagen, max(tamanos))
+    return {S: estadisticas_locales(tablas, S) for S in tamanos}
+
+#--------------------------------------------#
+#--------FILTRO ADAPTATIVO LOCAL OPT---------#
+#--------------------------------------------#
+
+def _filtro_adaptativo(J, var_total, media_local, var_local):
     # Evitar divisiones por cero o varianzas negativas por redondeo
     var_local = np.maximum(var_local, 1e-6)
     
@@ -461,6 +732,52 @@ def filtradoOpt(imagen):
     ratio = np.clip(ratio, 0, 1)
     
     # Aplicamos la fórmula a toda la matriz de golpe
-    ImgR = J - ratio * (J - media_local)
+    return J - ratio * (J - media_local)
+
+def filtradoOpt(imagen, S=3):
+    J = ruido_sal_pimienta(imagen)
+    return filtro_adaptativo_localOpt(J, S)
+
+def filtro_adaptativo_localOpt(J, S=3):
+    """
+    Filtro adaptativo local vectorizado sobre una imagen ya contaminada con ruido.
+    
+    Parámetros:
+    J (numpy.ndarray): Imagen en 2D (float64) con ruido.
+    S (int): Tamaño de la ventana (impar).
+    
+    Retorna:
+    numpy.ndarray: Imagen filtrada (float64).
+    """
+    var_total = np.var(J)
+    if var_total == 0: return J 
+
+    # --- VECTORIZACIÓN DEL CÁLCULO DE VARIANZA LOCAL ---
+    # Media y varianza local con imágenes integrales (O(1) por píxel para cualquier S)
+    tablas = tablas_integrales(J, S)
+    media_local, var_local = estadisticas_locales(tablas, S)
                 
-    return ImgR    
\ No newline at end of file
+    return _filtro_adaptativo(J, var_total, media_local, var_local)
+
+def filtradoMultiescala(imagen, tamanos=(3, 7, 15, 31)):
+    """
+    Filtro adaptativo local en varios tamaños de ventana con una sola pasada.
+    
+    El ruido se añade una vez y todas las escalas comparten las mismas
+    imágenes integrales, así que el costo es prácticamente el de una escala.
+    
+    Retorna:
+    dict: {S: imagen filtrada (float64)}
+    """
+    J = ruido_sal_pimienta(imagen)
+    
+    var_total = np.var(J)
+    if var_total == 0: return {S: J for S in tamanos}
+
+    tablas = tablas_integrales(J, max(tamanos))
+    resultados = {}
+    for S in tamanos:
+        media_local, var_local = estadisticas_locales(tablas, S)
+        resultados[S] = _filtro_adaptativo(J, var_total, media_local, var_local)
+
+    return resultados
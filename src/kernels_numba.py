@@ -0,0 +1,232 @@
+import numpy as np
+from numba import njit
+
+import funciones_Parcial2 as fun
+
+# Núcleos compilados con Numba (JIT) de los ciclos píxel por píxel de
+# funciones_Parcial2. Siguen al pie de la letra la versión de referencia,
+# salvo la mediana en uint8 con ventanas grandes, que usa histogramas por
+# columna (mismo resultado).
+# Este módulo solo se importa si numba está instalado.
+
+#--------------------------------------------#
+#------------- ECUALIZACIÓN -----------------#
+#--------------------------------------------#
+
+@njit(cache=True)
+def _ecualizacion_nucleo(image):
+    H, W = image.shape
+
+    nk = np.zeros(256, dtype=np.int64)
+    for i in range(H):
+        for j in range(W):
+            nk[image[i, j]] += 1
+
+    total = H * W
+    T = np.zeros(256, dtype=np.uint8)
+    acumulada = 0.0
+    for i in range(256):
+        acumulada = acumulada + nk[i] / total
+        T[i] = np.uint8(np.round(255 * acumulada))
+
+    salida = np.empty((H, W), dtype=np.uint8)
+    for i in range(H):
+        for j in range(W):
+            salida[i, j] = T[image[i, j]]
+
+    return salida
+
+def ecualizacion_histograma(image):
+    return _ecualizacion_nucleo(np.ascontiguousarray(image, dtype=np.uint8))
+
+#--------------------------------------------#
+#------------------ CLAHE -------------------#
+#--------------------------------------------#
+
+@njit(cache=True)
+def _clahe_interpolacion(image, T1, T2, T3, T4):
+    height, width = image.shape
+    IMG = np.zeros((height, width), dtype=np.uint8)
+
+    for i in range(height):
+        for j in range(width):
+            g = image[i, j]
+
+            dy = i / (height - 1)
+            dx = j / (width - 1)
+
+            w1 = (1 - dx) * (1 - dy)
+            w2 = dx * (1 - dy)
+            w3 = (1 - dx) * dy
+            w4 = dx * dy
+
+            valor = w1 * T1[g] + w2 * T3[g] + w3 * T2[g] + w4 * T4[g]
+            IMG[i, j] = np.uint8(valor)
+
+    return IMG
+
+def clahe(image):
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    T1, T2, T3, T4 = fun._tablas_clahe(image)
+    return _clahe_interpolacion(image, T1, T2, T3, T4)
+
+#--------------------------------------------#
+#------- FILTRO ADAPTATIVO LOCAL 3x3 --------#
+#--------------------------------------------#
+
+@njit(cache=True)
+def _filtro_adaptativo_nucleo(J, var_total):
+    height, width = J.shape
+    ImgR = np.zeros((height, width), dtype=np.float64)
+
+    Img1A = np.zeros((height + 2, width + 2), dtype=np.float64)
+    Img1A[1:height + 1, 1:width + 1] = J
+
+    for x in range(1, height + 1):
+        for y in range(1, width + 1):
+            pixVeci = Img1A[x - 1: x + 2, y - 1: y + 2]
+            sumR = np.mean(pixVeci)
+            var_local = np.mean((pixVeci - sumR) ** 2)
+
+            if var_local == 0 or var_local < var_total:
+                ImgR[x-1, y-1] = sumR
+            else:
+                ImgR[x-1, y-1] = J[x-1, y-1] - (var_total/var_local)*(J[x-1, y-1] - sumR)
+
+    return ImgR
+
+def filtro_adaptativo_local(J):
+    J = np.ascontiguousarray(J, dtype=np.float64)
+    var_total = np.var(J)
+    if var_total == 0:
+        return J
+    return _filtro_adaptativo_nucleo(J, var_total)
+
+#--------------------------------------------#
+#------ FILTRO DE MEDIANA ADAPTATIVO --------#
+#--------------------------------------------#
+
+@njit(cache=True)
+def _mediana_nucleo(img_pad, filas, columnas, pad_max, S_max):
+    salida = np.empty((filas, columnas), dtype=np.float32)
+    buffer = np.empty(S_max * S_max, dtype=np.float32)
+
+    for i in range(filas):
+        for j in range(columnas):
+            i_pad = i + pad_max
+            j_pad = j + pad_max
+            z_xy = img_pad[i_pad, j_pad]
+            salida[i, j] = z_xy
+
+            S_xy = 3
+            while S_xy <= S_max:
+                pad_actual = S_xy // 2
+
+                # Copiamos la vecindad actual al buffer
+                n = 0
+                for u in range(i_pad - pad_actual, i_pad + pad_actual + 1):
+                    for v in range(j_pad - pad_actual, j_pad + pad_actual + 1):
+                        buffer[n] = img_pad[u, v]
+                        n += 1
+
+                ventana = np.sort(buffer[:n])
+                z_min = ventana[0]
+                z_max = ventana[n - 1]
+                z_med = ventana[n // 2]
+
+                if z_min < z_med < z_max:
+                    if z_min < z_xy < z_max:
+                        salida[i, j] = z_xy
+                    else:
+                        salida[i, j] = z_med
+                    break
+                else:
+                    S_xy += 2
+                    if S_xy > S_max:
+                        salida[i, j] = z_med
+                        break
+
+    return salida
+
+@njit(cache=True)
+def _histograma_nucleo(region, S, alto, columnas, filas):
+    # Perreault-Hébert: histogramas por columna y un histograma de ventana que
+    # se desliza sumando la columna que entra y restando la que sale
+    z_min = np.zeros((alto, columnas), dtype=np.float32)
+    z_med = np.zeros((alto, columnas), dtype=np.float32)
+    z_max = np.zeros((alto, columnas), dtype=np.float32)
+
+    ancho = columnas + S - 1
+    hist_col = np.zeros((ancho, 256), dtype=np.int32)
+    kernel = np.zeros(256, dtype=np.int32)
+    rango = S * S // 2
+
+    for u in range(S):
+        for c in range(ancho):
+            hist_col[c, region[u, c]] += 1
+
+    for i in range(alto):
+        if i > 0:
+            for c in range(ancho):
+                hist_col[c, region[i - 1, c]] -= 1
+                hist_col[c, region[i + S - 1, c]] += 1
+        if not filas[i]:
+            continue
+
+        kernel[:] = 0
+        for c in range(S):
+            kernel += hist_col[c]
+
+        for j in range(columnas):
+            if j > 0:
+                kernel += hist_col[j + S - 1] - hist_col[j - 1]
+
+            g = 0
+            while kernel[g] == 0:
+                g += 1
+            z_min[i, j] = g
+
+            acumulada = 0
+            g = 0
+            while True:
+                acumulada += kernel[g]
+                if acumulada > rango:
+                    break
+                g += 1
+            z_med[i, j] = g
+
+            g = 255
+            while kernel[g] == 0:
+                g -= 1
+            z_max[i, j] = g
+
+    return z_min, z_med, z_max
+
+def estadisticas_histograma(img_pad, pad_max, forma, S, filas=None):
+    # Misma interfaz que funciones_Parcial2.estadisticas_histograma
+    alto, columnas = forma
+    a = pad_max - S // 2
+    region = np.ascontiguousarray(img_pad[a:a + alto + S - 1, a:a + columnas + S - 1])
+    if filas is None:
+        filas = np.ones(alto, dtype=np.bool_)
+    return _histograma_nucleo(region, S, alto, columnas, filas)
+
+def filtro_mediana(img, S_max):
+    if S_max % 2 == 0:
+        raise ValueError("El tamaño máximo de ventana S_max debe ser un número impar.")
+
+    if img.dtype == np.uint8 and S_max >= fun.S_HISTOGRAMA:
+        # Motor de histogramas: costo independiente del tamaño de ventana
+        pad_max = S_max // 2
+        img_pad = np.pad(img, pad_max, mode='reflect')
+        pendiente = np.ones(img.shape, dtype=np.bool_)
+        niveles = (estadisticas_histograma(img_pad, pad_max, img.shape, S, pendiente.any(axis=1))
+                   for S in range(3, S_max + 1, 2))
+        return fun.mediana_adaptativa(img.astype(np.float32), niveles, pendiente)
+
+    img = img.astype(np.float32)
+    pad_max = S_max // 2
+    img_pad = np.pad(img, pad_max, mode='reflect')
+
+    salida = _mediana_nucleo(img_pad, img.shape[0], img.shape[1], pad_max, S_max)
+    return np.clip(salida, 0, 255).astype(np.uint8)
@@ -2,7 +2,11 @@ import cv2
 import os
 import glob
 import random
+import argparse
 import funciones_Parcial1 as fun
+import backends
+import reparto
+import duplicados
 
 # --- Configuración ---
 input_folder = 'imagenes/fuego_con_humo_gris'
@@ -16,63 +20,67 @@ carpetas = {
     'tras':   '04_Traslacion',
     'esc':    '05_Escalamiento',
     'erase':  '06_Random_Erase',
-    'cutmix': '07_CutMix'
+    'cutmix': '07_CutMix',
+    'afin':   '08_Afin_Compuesta'
 }
 
-# Crear carpetas
-if not os.path.exists(output_base): os.makedirs(output_base)
-for k, nombre in carpetas.items():
-    path = os.path.join(output_base, nombre)
-    if not os.path.exists(path): os.makedirs(path)
+def crear_carpetas(output_base):
+    if not os.path.exists(output_base): os.makedirs(output_base)
+    for k, nombre in carpetas.items():
+        path = os.path.join(output_base, nombre)
+        if not os.path.exists(path): os.makedirs(path)
 
-# Obtener imágenes
-tipos = ('*.jpg', '*.png', '*.jpeg')
-lista_imagenes = []
-for ext in tipos:
-    lista_imagenes.extend(glob.glob(os.path.join(input_folder, ext)))
-
-if not lista_imagenes:
-    print(f"Error: No se encontraron imágenes en '{input_folder}'")
-    exit()
-
-print(f"Procesando {len(lista_imagenes)} imágenes...")
-
-for img_path in lista_imagenes:
+def procesar_imagen(img_path, output_base, lista_imagenes):
     filename = os.path.basename(img_path)
-    
+
     # 1. Cargar imagen original
     img_original = cv2.imread(img_path)
-    if img_original is None: continue
+    if img_original is None: return
+
+    crear_carpetas(output_base)
 
     # 2. Escala de Grises (Fundamental para el resto)
-    img_gris = fun.escalaGris(img_original)
+    img_gris = backends.ejecutar('escala_gris', img_original)
     cv2.imwrite(os.path.join(output_base, carpetas['gris'], filename), img_gris)
-    
+
     # 3. Augmentations
-    
+
     # a. Volteado Horizontal
     img_flip = fun.volteado(img_gris, modo='h')
     cv2.imwrite(os.path.join(output_base, carpetas['flip'], filename), img_flip)
-    
+
     # b. Rotación (ej. entre -45 y 45 grados)
     img_rot = fun.rotacion(img_gris, random.randint(-45, 45))
     cv2.imwrite(os.path.join(output_base, carpetas['rot'], filename), img_rot)
-    
+
     # c. Traslación
     tx, ty = random.randint(-44, 44), random.randint(-44, 44)
     img_tras = fun.traslacion(img_gris, tx, ty)
     cv2.imwrite(os.path.join(output_base, carpetas['tras'], filename), img_tras)
-    
+
     # d. Escalamiento (Zoom in/out)
     scale = random.uniform(0.1, 1.9)
     img_esc = fun.escalamiento(img_gris, scale)
     cv2.imwrite(os.path.join(output_base, carpetas['esc'], filename), img_esc)
-    
-    # e. Random Erase 
-    img_erase = fun.random_erase(img_gris, p=1.0) 
+
+    # e. Random Erase
+    img_erase = fun.random_erase(img_gris, p=1.0)
     cv2.imwrite(os.path.join(output_base, carpetas['erase'], filename), img_erase)
-    
-    # f. CutMix
+
+    # f. Afín compuesta: volteo + rotación + escala + cizallamiento + traslación
+    #    en una sola matriz, con un único remuestreo
+    h, w = img_gris.shape
+    centro = (w // 2, h // 2)
+    M = fun.componer_afin(
+        fun.matriz_volteado(w, h, modo=random.choice(('h', 'ninguno'))),
+        fun.matriz_rotacion(random.randint(-45, 45), centro),
+        fun.matriz_escalamiento(random.uniform(0.8, 1.2), centro=centro),
+        fun.matriz_cizallamiento(random.uniform(-0.2, 0.2), centro=centro),
+        fun.matriz_traslacion(random.randint(-44, 44), random.randint(-44, 44)))
+    img_afin = fun.transformacion_afin(img_gris, M, borde='reflejar')
+    cv2.imwrite(os.path.join(output_base, carpetas['afin'], filename), img_afin)
+
+    # g. CutMix
     if len(lista_imagenes) > 1:
         partner = random.choice(lista_imagenes)
         img_partner = cv2.imread(partner)
@@ -81,4 +89,42 @@ for img_path in lista_imagenes:
             img_cutmix = fun.cutmix(img_gris, img_partner_gris)
             cv2.imwrite(os.path.join(output_base, carpetas['cutmix'], filename), img_cutmix)
 
-print("¡Proceso finalizado exitosamente!")
\ No newline at end of file
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Aumento de datos (primer parcial)')
+    parser.add_argument('--entrada', default=input_folder, help='Carpeta de imágenes de entrada')
+    parser.add_argument('--salida', default=output_base, help='Carpeta base de resultados')
+    parser.add_argument('--backend', choices=backends.BACKENDS + ('auto',), default=None,
+                        help='Implementación a usar en todas las operaciones (por defecto: automático)')
+    reparto.agregar_argumentos(parser)
+    duplicados.agregar_argumentos(parser)
+    args = parser.parse_args()
+    if args.backend: backends.configurar(args.backend)
+
+    # Crear carpetas
+    crear_carpetas(args.salida)
+
+    # Obtener imágenes
+    tipos = ('*.jpg', '*.png', '*.jpeg')
+    lista_imagenes = []
+    for ext in tipos:
+        lista_imagenes.extend(glob.glob(os.path.join(args.entrada, ext)))
+
+    if not lista_imagenes:
+        print(f"Error: No se encontraron imágenes en '{args.entrada}'")
+        exit()
+
+    # Pre-pasada: omitir imágenes casi iguales a otra ya incluida
+    lista_imagenes = duplicados.filtrar(args, lista_imagenes)
+
+    print(f"Procesando {len(lista_imagenes)} imágenes...")
+
+    procesar = lambda img_path, salida: procesar_imagen(img_path, salida, lista_imagenes)
+    if args.coordinador:
+        coordinador = reparto.Coordinador(args.coordinador, lista_imagenes, args.shards,
+                                          args.lease_s, args.trabajador)
+        reparto.ejecutar_repartido(coordinador, procesar, args.salida)
+    else:
+        for img_path in lista_imagenes:
+            procesar(img_path, args.salida)
+
+    print("¡Proceso finalizado exitosamente!")
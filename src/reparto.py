@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import shutil
+import socket
+import threading
+import zlib
+
+# Ejecución repartida (shards) entre varias máquinas o procesos.
+#
+# No hay servicio central: todos los trabajadores comparten un directorio
+# coordinador (p. ej. en un disco de red) con esta estructura:
+#
+#   trabajo.json          lista de entradas y número de shards (igual para todos)
+#   leases/0003.lease     quién está procesando el shard 3 y hasta cuándo
+#   hechos/0003.json      el shard 3 terminó y sus resultados ya se integraron
+#
+# Un shard se reclama creando su lease de forma exclusiva. El dueño renueva
+# el lease mientras trabaja; si el proceso muere, el lease expira y otro
+# trabajador lo reclama y vuelve a procesar el shard desde cero. Un lease
+# ilegible (p. ej. vacío) expira según la fecha de modificación del archivo.
+#
+# Cada trabajador escribe primero en <salida>/.shards/<shard>.<trabajador>/ y,
+# si sigue siendo el dueño al terminar, mueve sus archivos a la estructura
+# normal <salida>/<subcarpeta>/<imagen>. Un dueño que perdió el lease no
+# puede pisar los archivos del nuevo dueño.
+
+def particionar(rutas, n_shards):
+    """Reparto determinista: las rutas ordenadas se asignan en round-robin."""
+    if n_shards < 1:
+        raise ValueError("El número de shards debe ser al menos 1.")
+    rutas = sorted(rutas)
+    return [rutas[i::n_shards] for i in range(n_shards)]
+
+def id_trabajador():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+#--------------------------------------------#
+#---------- ARCHIVOS ATÓMICOS ---------------#
+#--------------------------------------------#
+
+def _escribir_json(path, datos):
+    # Escritura atómica: archivo temporal + os.replace
+    tmp = f"{path}.{id_trabajador()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    os.replace(tmp, path)
+
+def _crear_exclusivo(path, datos):
+    # True si este proceso creó el archivo; False si ya existía.
+    # Se escribe completo en un temporal y se enlaza: nunca queda a medio escribir
+    tmp = f"{path}.{id_trabajador()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(datos, f)
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp)
+    return True
+
+def _leer_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None # Ausente o a medio escribir
+
+#--------------------------------------------#
+#--------------- COORDINADOR ----------------#
+#--------------------------------------------#
+
+class Coordinador:
+    def __init__(self, directorio, rutas, n_shards, duracion_lease=300, trabajador=None):
+        self.dir = directorio
+        self.duracion = duracion_lease
+        self.trabajador = trabajador or id_trabajador()
+
+        os.makedirs(os.path.join(directorio, 'leases'), exist_ok=True)
+        os.makedirs(os.path.join(directorio, 'hechos'), exist_ok=True)
+
+        # El primero en llegar fija el trabajo; los demás deben pedir exactamente lo mismo
+        # Rutas tal como se dan (relativas a la raíz del repo): así sirven en todas las máquinas
+        entradas = sorted(os.path.normpath(r) for r in rutas)
+        trabajo = {'n_shards': n_shards, 'entradas': entradas}
+        path = os.path.join(directorio, 'trabajo.json')
+        if not _crear_exclusivo(path, trabajo):
+            existente = None
+            while existente is None: # Otro proceso puede estar escribiéndolo
+                existente = _leer_json(path)
+                if existente is None: time.sleep(0.1)
+            if existente != trabajo:
+                raise ValueError(f"El directorio coordinador '{directorio}' pertenece a otro trabajo "
+                                 f"(distintas entradas o número de shards).")
+
+        self.shards = particionar(entradas, n_shards)
+
+    def _lease(self, shard):
+        return os.path.join(self.dir, 'leases', f"{shard:04d}.lease")
+
+    def _hecho(self, shard):
+        return os.path.join(self.dir, 'hechos', f"{shard:04d}.json")
+
+    def terminado(self, shard):
+        return os.path.exists(self._hecho(shard))
+
+    def _vencido(self, path, datos):
+        if datos is not None:
+            return datos['expira'] <= time.time()
+        # Ilegible: vence por la fecha de modificación
+        try:
+            return os.path.getmtime(path) + self.duracion <= time.time()
+        except FileNotFoundError:
+            return False
+
+    def reclamar(self, shard):
+        """Intenta tomar el shard. True si ahora este trabajador es el dueño."""
+        if self.terminado(shard):
+            return False
+
+        lease = self._lease(shard)
+        datos = {'trabajador': self.trabajador, 'expira': time.time() + self.duracion}
+        if _crear_exclusivo(lease, datos):
+            return True
+
+        actual = _leer_json(lease)
+        if not self._vencido(lease, actual):
+            return False
+
+        # Lease expirado: lo apartamos con un rename. Otro trabajador pudo
+        # reemplazarlo entre la lectura y el rename, así que comprobamos que lo
+        # apartado sea el mismo lease expirado; si no, lo devolvemos a su lugar
+        apartado = f"{lease}.expirado.{self.trabajador}"
+        try:
+            os.rename(lease, apartado)
+        except FileNotFoundError:
+            return False
+        if _leer_json(apartado) != actual or not self._vencido(apartado, actual):
+            try:
+                os.link(apartado, lease)
+            except FileExistsError:
+                pass
+            os.remove(apartado)
+            return False
+
+        os.remove(apartado)
+        return _crear_exclusivo(lease, datos)
+
+    def es_dueno(self, shard):
+        actual = _leer_json(self._lease(shard))
+        return actual is not None and actual['trabajador'] == self.trabajador
+
+    def renovar(self, shard):
+        if not self.es_dueno(shard):
+            return False
+        _escribir_json(self._lease(shard), {'trabajador': self.trabajador,
+                                            'expira': time.time() + self.duracion})
+        return True
+
+    def completar(self, shard, procesadas, fallidas=()):
+        _escribir_json(self._hecho(shard), {'trabajador': self.trabajador,
+                                            'procesadas': procesadas,
+                                            'fallidas': list(fallidas),
+                                            'fin': time.time()})
+        try:
+            os.remove(self._lease(shard))
+        except FileNotFoundError:
+            pass
+
+    def estado(self):
+        hechos = sum(self.terminado(s) for s in range(len(self.shards)))
+        ocupados = sum(os.path.exists(self._lease(s)) and not self.terminado(s)
+                       for s in range(len(self.shards)))
+        return {'shards': len(self.shards), 'hechos': hechos, 'en_proceso': ocupados,
+                'pendientes': len(self.shards) - hechos - ocupados}
+
+#--------------------------------------------#
+#--------------- EJECUCIÓN ------------------#
+#--------------------------------------------#
+
+def integrar(staging, salida):
+    """Mueve los resultados de un shard a la estructura normal de salida."""
+    for raiz, _, archivos in os.walk(staging):
+        destino = os.path.join(salida, os.path.relpath(raiz, staging))
+        os.makedirs(destino, exist_ok=True)
+        for nombre in archivos:
+            os.replace(os.path.join(raiz, nombre), os.path.join(destino, nombre))
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        os.rmdir(os.path.dirname(staging)) # .shards, si ya no quedan otros shards
+    except OSError:
+        pass
+
+def _renovar_periodicamente(coordinador, shard, parar):
+    while not parar.wait(coordinador.duracion / 3):
+        if not coordinador.renovar(shard):
+            return
+
+def ejecutar_repartido(coordinador, procesar, salida, espera=5):
+    """
+    Procesa shards hasta que todos estén terminados.
+
+    procesar(ruta, salida_shard) se llama para cada imagen del shard y
+    debe escribir sus resultados dentro de salida_shard. Si falla en una
+    imagen, el error se reporta, se anota en hechos/ y se sigue con la siguiente.
+    Retorna el número de shards que procesó este trabajador.
+    """
+    n = len(coordinador.shards)
+    # Cada trabajador empieza en un shard distinto para reducir la competencia
+    inicio = zlib.crc32(coordinador.trabajador.encode()) % n
+    orden = [(inicio + i) % n for i in range(n)]
+    propios = 0
+
+    while True:
+        reclamado = False
+        for shard in orden:
+            if not coordinador.reclamar(shard):
+                continue
+            reclamado = True
+
+            staging = os.path.join(salida, '.shards', f"{shard:04d}.{coordinador.trabajador}")
+            shutil.rmtree(staging, ignore_errors=True) # Restos de una corrida anterior
+
+            parar = threading.Event()
+            hilo = threading.Thread(target=_renovar_periodicamente,
+                                    args=(coordinador, shard, parar), daemon=True)
+            hilo.start()
+            fallidas = []
+            try:
+                for ruta in coordinador.shards[shard]:
+                    try:
+                        procesar(ruta, staging)
+                    except Exception as e:
+                        print(f"[{coordinador.trabajador}] Error procesando {ruta}: {e!r}")
+                        fallidas.append(ruta)
+            finally:
+                parar.set()
+                hilo.join()
+
+            # Si perdimos el lease (p. ej. una pausa larga) otro trabajador rehace el shard
+            if not coordinador.es_dueno(shard):
+                print(f"[{coordinador.trabajador}] Se perdió el lease del shard {shard}; se descarta.")
+                shutil.rmtree(staging, ignore_errors=True)
+                continue
+
+            integrar(staging, salida)
+            coordinador.completar(shard, len(coordinador.shards[shard]) - len(fallidas), fallidas)
+            propios += 1
+            print(f"[{coordinador.trabajador}] shard {shard} terminado {coordinador.estado()}")
+
+        estado = coordinador.estado()
+        if estado['hechos'] == n:
+            return propios
+        if not reclamado:
+            # Quedan shards en manos de otros: esperamos a que terminen o expiren
+            time.sleep(espera)
+
+def agregar_argumentos(parser):
+    grupo = parser.add_argument_group('ejecución repartida')
+    grupo.add_argument('--coordinador', default=None,
+                       help='Directorio compartido para repartir el trabajo entre procesos/máquinas')
+    grupo.add_argument('--shards', type=int, default=16, help='Número de shards del trabajo')
+    grupo.add_argument('--trabajador', default=None, help='Identificador de este trabajador')
+    grupo.add_argument('--lease-s', type=float, default=300,
+                       help='Segundos tras los que un shard abandonado se puede reclamar')
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Estado de un trabajo repartido')
+    parser.add_argument('coordinador')
+    args = parser.parse_args()
+
+    trabajo = _leer_json(os.path.join(args.coordinador, 'trabajo.json'))
+    if trabajo is None:
+        print(f"Error: '{args.coordinador}' no es un directorio coordinador")
+        exit()
+    c = Coordinador(args.coordinador, trabajo['entradas'], trabajo['n_shards'])
+    print(json.dumps(c.estado()))
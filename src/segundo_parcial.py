@@ -2,7 +2,11 @@ import numpy as np
 import cv2
 import os
 import glob
+import argparse
 import funciones_Parcial2 as fun
+import backends
+import reparto
+import duplicados
 
 input_folder = 'resultados_procesamiento_MuchoFuego/01_EscalaGris'
 output_folder = 'resultados_MuchoFuego_Parcial2'
@@ -16,44 +20,35 @@ carpetas = {
     'filtroMediana': '06_filtroMediana'
 }
 
-# Crear carpetas
-if not os.path.exists(output_folder): os.makedirs(output_folder)
-for k, nombre in carpetas.items():
-    path = os.path.join(output_folder, nombre)
-    if not os.path.exists(path): os.makedirs(path)
+def crear_carpetas(output_folder):
+    if not os.path.exists(output_folder): os.makedirs(output_folder)
+    for k, nombre in carpetas.items():
+        path = os.path.join(output_folder, nombre)
+        if not os.path.exists(path): os.makedirs(path)
 
-# Obtener imágenes
-tipos = ('*.jpg', '*.png', '*.jpeg')
-lista_imagenes = []
-for ext in tipos:
-    lista_imagenes.extend(glob.glob(os.path.join(input_folder, ext)))
-
-if not lista_imagenes:
-    print(f"Error: No se encontraron imágenes en '{input_folder}'")
-    exit()
-
-print(f"Procesando {len(lista_imagenes)} imágenes...")
-
-for img_path in lista_imagenes:
+def procesar_imagen(img_path, output_folder):
     filename = os.path.basename(img_path)
 
     #Cargar imagen original
     img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-    if img is None: 
+    if img is None:
         print(f"No se pudo leer: {filename}")
-        continue
+        return
+
+    crear_carpetas(output_folder)
 
     # 1. CLAHE
-    img_clahe = fun.claheOpt(img)
+    img_clahe = backends.ejecutar('clahe', img)
     cv2.imwrite(os.path.join(output_folder, carpetas['clahe'], filename), img_clahe)
-    
+
     # 2. Filtro adaptativo local
-    img_filtrada = fun.filtradoOpt(img)
+    J = fun.ruido_sal_pimienta(img)
+    img_filtrada = backends.ejecutar('filtro_adaptativo', J)
     img_filtrada = np.clip(img_filtrada, 0, 255).astype(np.uint8)
     cv2.imwrite(os.path.join(output_folder, carpetas['filtro'], filename), img_filtrada)
 
     # 3. Ecualizacion de histograma
-    img_histeq = fun.ecualizacion_histograma(img)
+    img_histeq = backends.ejecutar('ecualizacion_histograma', img)
     cv2.imwrite(os.path.join(output_folder, carpetas['histeq'], filename), img_histeq)
 
     # 4. Highboost
@@ -69,7 +64,44 @@ for img_path in lista_imagenes:
 
     # 6. Filtro de Mediana Adaptativo
     # S_max debe ser impar. Le ponemos 7 por defecto como en el libro.
-    img_mediana = fun.filtro_mediana(img, S_max=7)
+    img_mediana = backends.ejecutar('filtro_mediana', img, S_max=7)
     cv2.imwrite(os.path.join(output_folder, carpetas['filtroMediana'], filename), img_mediana)
 
-print("¡Proceso finalizado exitosamente!")
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Realce de imágenes (segundo parcial)')
+    parser.add_argument('--entrada', default=input_folder, help='Carpeta de imágenes de entrada')
+    parser.add_argument('--salida', default=output_folder, help='Carpeta base de resultados')
+    parser.add_argument('--backend', choices=backends.BACKENDS + ('auto',), default=None,
+                        help='Implementación a usar en todas las operaciones (por defecto: automático)')
+    reparto.agregar_argumentos(parser)
+    duplicados.agregar_argumentos(parser)
+    args = parser.parse_args()
+    if args.backend: backends.configurar(args.backend)
+
+    # Crear carpetas
+    crear_carpetas(args.salida)
+
+    # Obtener imágenes
+    tipos = ('*.jpg', '*.png', '*.jpeg')
+    lista_imagenes = []
+    for ext in tipos:
+        lista_imagenes.extend(glob.glob(os.path.join(args.entrada, ext)))
+
+    if not lista_imagenes:
+        print(f"Error: No se encontraron imágenes en '{args.entrada}'")
+        exit()
+
+    # Pre-pasada: omitir imágenes casi iguales a otra ya incluida
+    lista_imagenes = duplicados.filtrar(args, lista_imagenes)
+
+    print(f"Procesando {len(lista_imagenes)} imágenes...")
+
+    if args.coordinador:
+        coordinador = reparto.Coordinador(args.coordinador, lista_imagenes, args.shards,
+                                          args.lease_s, args.trabajador)
+        reparto.ejecutar_repartido(coordinador, procesar_imagen, args.salida)
+    else:
+        for img_path in lista_imagenes:
+            procesar_imagen(img_path, args.salida)
+
+    print("¡Proceso finalizado exitosamente!")
@@ -0,0 +1,302 @@
+import asyncio
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+import cv2
+
+# Servicio local de realce con micro-lotes.
+#
+# Mantiene procesos trabajadores calientes (módulos importados y núcleos JIT
+# compilados), acumula las peticiones que llegan durante unos milisegundos y
+# las procesa como un lote. Protocolo HTTP/1.1 mínimo en localhost:
+#
+#   POST /procesar?op=clahe                 cuerpo: imagen codificada (jpg/png)
+#   POST /procesar?op=highboost&k=1.8&ksize=5
+#   POST /procesar?op=mediana&S_max=7
+#   GET  /metricas                          profundidad de cola, latencias, lotes
+#
+# La respuesta de /procesar es la imagen resultante en PNG.
+
+#--------------------------------------------#
+#---------- LADO DEL TRABAJADOR -------------#
+#--------------------------------------------#
+
+_OPERACIONES = {
+    'clahe': {},
+    'highboost': {'k': float, 'ksize': int},
+    'mediana': {'S_max': int},
+    'ecualizacion': {},
+}
+
+def _cargar_modulos(backend):
+    global backends, fun
+    import backends
+    import funciones_Parcial2 as fun
+    if backend: backends.configurar(backend)
+
+def _iniciar_trabajador(backend):
+    # Se ejecuta una vez por proceso: importa los módulos y calienta los núcleos
+    _cargar_modulos(backend)
+
+    img = np.random.default_rng(0).integers(0, 256, (32, 32)).astype(np.uint8)
+    for op in _OPERACIONES:
+        _aplicar(op, {}, img)
+
+def _aplicar(op, params, img):
+    if op == 'clahe':
+        return backends.ejecutar('clahe', img)
+    if op == 'highboost':
+        return fun.highboost(img, k=params.get('k', 1.8), ksize=params.get('ksize', 5))
+    if op == 'mediana':
+        return backends.ejecutar('filtro_mediana', img, S_max=params.get('S_max', 7))
+    if op == 'ecualizacion':
+        return backends.ejecutar('ecualizacion_histograma', img)
+    raise ValueError(f"Operación desconocida: '{op}'")
+
+def procesar_lote(op, params, imagenes):
+    """Decodifica, procesa y codifica en PNG un lote de imágenes (en el trabajador)."""
+    # Un error en una imagen solo afecta a su posición, no al resto del lote
+    salida = []
+    for datos in imagenes:
+        try:
+            img = cv2.imdecode(np.frombuffer(datos, np.uint8), cv2.IMREAD_GRAYSCALE)
+        except cv2.error:
+            img = None
+        if img is None:
+            salida.append(None)
+            continue
+        try:
+            ok, png = cv2.imencode('.png', _aplicar(op, params, img))
+            salida.append(png.tobytes() if ok else None)
+        except Exception as e:
+            salida.append(e)
+    return salida
+
+#--------------------------------------------#
+#----------- LADO DEL SERVIDOR --------------#
+#--------------------------------------------#
+
+def _leer_parametros(op, query):
+    if op not in _OPERACIONES:
+        raise ValueError(f"Operación desconocida: '{op}'. Opciones: {sorted(_OPERACIONES)}")
+    tipos = _OPERACIONES[op]
+    params = {}
+    for nombre, valor in query.items():
+        if nombre == 'op': continue
+        if nombre not in tipos:
+            raise ValueError(f"Parámetro desconocido para '{op}': '{nombre}'")
+        params[nombre] = tipos[nombre](valor)
+    return params
+
+class Metricas:
+    def __init__(self, ventana=2000, ventana_s=10):
+        self.inicio = time.perf_counter()
+        self.latencias = deque(maxlen=ventana) # Segundos, últimas peticiones
+        self.terminadas = deque(maxlen=ventana) # Instante en que se atendió cada una
+        self.tam_lotes = deque(maxlen=ventana)
+        self.ventana_s = ventana_s
+        self.atendidas = 0
+        self.errores = 0
+        self.lotes = 0
+
+    def ritmo(self):
+        # Peticiones atendidas por segundo en los últimos ventana_s segundos
+        ahora = time.perf_counter()
+        desde = max(ahora - self.ventana_s, self.inicio)
+        recientes = [t for t in self.terminadas if t >= desde]
+        if len(recientes) == self.terminadas.maxlen:
+            desde = recientes[0] # El deque ya no cubre toda la ventana
+        return len(recientes) / (ahora - desde) if ahora > desde else 0.0
+
+    def resumen(self, cola, lotes_en_curso):
+        lat = np.array(self.latencias) * 1000
+        percentiles = (np.percentile(lat, [50, 95, 99]).round(2).tolist()
+                       if lat.size else [None, None, None])
+        return {
+            'cola': cola,
+            'lotes_en_curso': lotes_en_curso,
+            'atendidas': self.atendidas,
+            'errores': self.errores,
+            'lotes': self.lotes,
+            'tam_lote_medio': round(float(np.mean(self.tam_lotes)), 2) if self.tam_lotes else None,
+            'latencia_ms': dict(zip(('p50', 'p95', 'p99'), percentiles)),
+            'peticiones_por_s': round(self.ritmo(), 2),
+        }
+
+class Servicio:
+    def __init__(self, trabajadores=None, espera_ms=5, max_lote=32, backend=None):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.espera = espera_ms / 1000
+        self.max_lote = max_lote
+        self.backend = backend
+        self.cola = asyncio.Queue()
+        self.en_proceso = 0
+        self.lotes_en_curso = 0
+        self.metricas = Metricas()
+        self.pool = None
+        self._tareas = set()
+
+    async def iniciar(self):
+        self.pool = ProcessPoolExecutor(self.trabajadores, initializer=_iniciar_trabajador,
+                                        initargs=(self.backend,))
+        # Forzamos el arranque de todos los procesos antes de aceptar peticiones
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, procesar_lote, 'clahe', {}, [])
+                               for _ in range(self.trabajadores)))
+        self.metricas = Metricas()
+        self._tarea_lotes = asyncio.create_task(self._despachar())
+
+    def cerrar(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def procesar(self, op, params, datos):
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((op, params, datos, futuro, time.perf_counter()))
+        return await futuro
+
+    async def _despachar(self):
+        # Junta peticiones durante 'espera' segundos (o hasta max_lote) y las manda en lotes
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self.cola.get()]
+            limite = loop.time() + self.espera
+            while len(pendientes) < self.max_lote:
+                restante = limite - loop.time()
+                if restante <= 0: break
+                try:
+                    pendientes.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            # Agrupamos por operación y parámetros. Un grupo solo se parte entre los
+            # trabajadores libres; con todos ocupados se manda entero como un lote
+            grupos = {}
+            for p in pendientes:
+                grupos.setdefault((p[0], tuple(sorted(p[1].items()))), []).append(p)
+            for (op, params), grupo in grupos.items():
+                libres = self.trabajadores - self.lotes_en_curso
+                partes = max(1, min(libres, len(grupo)))
+                for i in range(partes):
+                    self.lotes_en_curso += 1
+                    tarea = asyncio.create_task(self._ejecutar_lote(op, dict(params), grupo[i::partes]))
+                    self._tareas.add(tarea)
+                    tarea.add_done_callback(self._tareas.discard)
+
+    async def _ejecutar_lote(self, op, params, lote):
+        loop = asyncio.get_running_loop()
+        self.en_proceso += len(lote)
+        self.metricas.lotes += 1
+        self.metricas.tam_lotes.append(len(lote))
+        try:
+            resultados = await loop.run_in_executor(self.pool, procesar_lote, op, params,
+                                                    [p[2] for p in lote])
+        except Exception as e:
+            resultados = [e] * len(lote)
+        finally:
+            self.en_proceso -= len(lote)
+            self.lotes_en_curso -= 1
+
+        fin = time.perf_counter()
+        for (_, _, _, futuro, llegada), res in zip(lote, resultados):
+            self.metricas.latencias.append(fin - llegada)
+            if futuro.done(): continue
+            if res is None or isinstance(res, Exception):
+                self.metricas.errores += 1
+                futuro.set_exception(res if isinstance(res, Exception)
+                                     else ValueError("No se pudo decodificar la imagen"))
+            else:
+                self.metricas.atendidas += 1
+                self.metricas.terminadas.append(fin)
+                futuro.set_result(res)
+
+    #--------------------------------------------#
+    #----------------- HTTP ---------------------#
+    #--------------------------------------------#
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea: break
+                metodo, ruta, _ = linea.decode('latin-1').split(' ', 2)
+
+                cabeceras = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''): break
+                    nombre, _, valor = h.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+                cuerpo = await reader.readexactly(int(cabeceras.get('content-length', 0)))
+
+                estado, tipo, respuesta = await self._responder(metodo, ruta, cuerpo)
+                cerrar = cabeceras.get('connection', '').lower() == 'close'
+                writer.write((f"HTTP/1.1 {estado}\r\n"
+                              f"Content-Type: {tipo}\r\n"
+                              f"Content-Length: {len(respuesta)}\r\n"
+                              f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n"
+                              ).encode('latin-1') + respuesta)
+                await writer.drain()
+                if cerrar: break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _responder(self, metodo, ruta, cuerpo):
+        url = urlsplit(ruta)
+        if metodo == 'GET' and url.path == '/metricas':
+            # Cola: peticiones aún sin despachar más las ya enviadas al pool sin terminar
+            datos = self.metricas.resumen(self.cola.qsize() + self.en_proceso, self.lotes_en_curso)
+            return '200 OK', 'application/json', json.dumps(datos).encode()
+
+        if metodo == 'POST' and url.path == '/procesar':
+            query = dict(parse_qsl(url.query))
+            try:
+                op = query.get('op', '')
+                params = _leer_parametros(op, query)
+                png = await self.procesar(op, params, cuerpo)
+            except (ValueError, TypeError) as e:
+                return '400 Bad Request', 'text/plain; charset=utf-8', str(e).encode()
+            except Exception as e:
+                return '500 Internal Server Error', 'text/plain; charset=utf-8', repr(e).encode()
+            return '200 OK', 'image/png', png
+
+        return '404 Not Found', 'text/plain; charset=utf-8', b'No encontrado'
+
+async def servir(host='127.0.0.1', puerto=8765, **opciones):
+    servicio = Servicio(**opciones)
+    await servicio.iniciar()
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    print(f"Servicio escuchando en http://{host}:{puerto} "
+          f"({servicio.trabajadores} trabajadores, espera {servicio.espera * 1000:g} ms, "
+          f"lote máx. {servicio.max_lote})")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servicio local de realce con micro-lotes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--trabajadores', type=int, default=None)
+    parser.add_argument('--espera-ms', type=float, default=5,
+                        help='Tiempo que se acumulan peticiones antes de lanzar un lote')
+    parser.add_argument('--max-lote', type=int, default=32)
+    parser.add_argument('--backend', default=None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(servir(args.host, args.puerto, trabajadores=args.trabajadores,
+                           espera_ms=args.espera_ms, max_lote=args.max_lote,
+                           backend=args.backend))
+    except KeyboardInterrupt:
+        pass